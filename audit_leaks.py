@@ -0,0 +1,241 @@
+"""
+Offline temporal-leak audit over stored runs.
+
+Re-checks every news item a run showed the agent (raw_data/*.json and the
+step entries of experiment.jsonl, resolving article IDs via articles.jsonl)
+against the step's cutoff:
+
+  * pattern   - the compiled leak pattern packs (same LeakGuard as get_news)
+  * published - article timestamp on/after the cutoff
+  * mention   - explicit dates in the text after the cutoff (day or month
+                precision). Scheduled events also show up here, so these
+                are candidates for review rather than proven leaks.
+
+Runs are scanned in parallel, one process per run directory.
+
+Usage:
+    python3 audit_leaks.py                      # whole runs/ tree, bundled packs
+    python3 audit_leaks.py runs/bitcoin --leak-patterns extra_pack.json --json audit.json
+"""
+
+import os
+import re
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.data_loaders.leak_guard import LeakGuard
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH = r"(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+_DATE_RE = re.compile(
+    r"\b(?:"
+    r"(?P<iy>(?:19|20)\d{2})-(?P<im>\d{1,2})-(?P<id>\d{1,2})"
+    r"|" + _MONTH.replace("(", "(?P<am>", 1) + r"\s+(?P<ad>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<ay>(?:19|20)\d{2})"
+    r"|(?P<bd>\d{1,2})(?:st|nd|rd|th)?\s+" + _MONTH.replace("(", "(?P<bm>", 1) + r",?\s+(?P<by>(?:19|20)\d{2})"
+    r"|" + _MONTH.replace("(", "(?P<cm>", 1) + r",?\s+(?P<cy>(?:19|20)\d{2})"
+    r")\b",
+    re.IGNORECASE,
+)
+
+
+def extract_dates(texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    """
+    All explicit date mentions in `texts`. Returns (text index, date as
+    datetime64[D], is_day_precision, matched strings); month-only mentions
+    are dated to the first of the month.
+    """
+    idx, years, months, days, spans = [], [], [], [], []
+    for i, text in enumerate(texts):
+        for m in _DATE_RE.finditer(text):
+            g = m.groupdict()
+            if g["iy"]:
+                y, mo, d = int(g["iy"]), int(g["im"]), int(g["id"])
+            elif g["ay"]:
+                y, mo, d = int(g["ay"]), _MONTHS[g["am"][:3].lower()], int(g["ad"])
+            elif g["by"]:
+                y, mo, d = int(g["by"]), _MONTHS[g["bm"][:3].lower()], int(g["bd"])
+            else:
+                y, mo, d = int(g["cy"]), _MONTHS[g["cm"][:3].lower()], 0
+            if not (1 <= mo <= 12 and 0 <= d <= 31):
+                continue
+            idx.append(i)
+            years.append(y)
+            months.append(mo)
+            days.append(d)
+            spans.append(" ".join(m.group(0).split()))
+
+    idx = np.array(idx, dtype=np.int64)
+    days = np.array(days, dtype=np.int64)
+    month_start = (np.array(years, dtype=np.int64) - 1970) * 12 + np.array(months, dtype=np.int64) - 1
+    dates = month_start.astype("datetime64[M]").astype("datetime64[D]") + np.maximum(days - 1, 0).astype("timedelta64[D]")
+    return idx, dates, days > 0, spans
+
+
+def _parse_cutoff(raw_step: Dict[str, Any]) -> Optional[datetime]:
+    m = re.search(r"cutoff: ([\d-]+ [\d:]+)", raw_step.get("context_window", ""))
+    if m:
+        return datetime.strptime(m.group(1), "%Y-%m-%d %H:%M:%S")
+    if raw_step.get("date"):
+        return datetime.strptime(raw_step["date"], "%Y-%m-%d") - timedelta(seconds=1)
+    return None
+
+
+def _parse_ts(value: Any) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        try:
+            return datetime.strptime(str(value)[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+
+
+def iter_run_articles(run_dir: str) -> Iterator[Dict[str, Any]]:
+    """Yields {cutoff, published, headline, content, where} for every news item shown in a run."""
+    articles = {}
+    articles_path = os.path.join(run_dir, "articles.jsonl")
+    if os.path.exists(articles_path):
+        with open(articles_path) as f:
+            for line in f:
+                if line.strip():
+                    a = json.loads(line)
+                    articles[a["id"]] = a
+
+    def resolve(n: Dict[str, Any]) -> Dict[str, Any]:
+        # Newer runs log article references; the body lives in articles.jsonl
+        full = articles.get(n.get("id"), {})
+        return {
+            "headline": n.get("headline") or full.get("headline", ""),
+            "content": n.get("content") or full.get("content", ""),
+            "published": n.get("timestamp") or full.get("timestamp") or n.get("date"),
+        }
+
+    raw_dir = os.path.join(run_dir, "raw_data")
+    if os.path.isdir(raw_dir):
+        for name in sorted(os.listdir(raw_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(raw_dir, name)) as f:
+                    step = json.load(f)
+            except (OSError, ValueError):
+                continue
+            cutoff = _parse_cutoff(step)
+            for n in step.get("news", []):
+                yield dict(resolve(n), cutoff=cutoff, where=f"raw_data/{name}")
+
+    log_path = os.path.join(run_dir, "experiment.jsonl")
+    if os.path.exists(log_path):
+        with open(log_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("event_type") != "step":
+                    continue
+                data = entry["data"]
+                cutoff = _parse_ts(data["timestamp"]) - timedelta(seconds=1)
+                observation = data.get("observation", {})
+                items = observation.get("news") or [{"id": aid} for aid in observation.get("news_ids", [])]
+                for n in items:
+                    yield dict(resolve(n), cutoff=cutoff, where=f"experiment.jsonl@{data['timestamp'][:10]}")
+
+
+def audit_run(run_dir: str, pattern_paths: Optional[List[str]] = None, include_default: bool = True) -> Dict[str, Any]:
+    guard = LeakGuard.from_paths(pattern_paths, include_default=include_default)
+
+    # raw_data and the step log show the same articles; audit each (article, cutoff) once
+    seen, items = set(), []
+    for a in iter_run_articles(run_dir):
+        key = (a["headline"], a["content"][:200], a["cutoff"])
+        if a["cutoff"] is None or key in seen:
+            continue
+        seen.add(key)
+        items.append(a)
+
+    findings = []
+    for a in items:
+        leak = guard.check(a["headline"], a["content"], a["cutoff"])
+        if leak:
+            findings.append({"type": "pattern", "where": a["where"], "headline": a["headline"], "cutoff": a["cutoff"].isoformat(), **leak.dict()})
+        published = _parse_ts(a["published"]) if a["published"] else None
+        # raw_data only keeps the publication day: compare at day precision there
+        if published and (published.date() > a["cutoff"].date() if len(str(a["published"])) <= 10 else published > a["cutoff"]):
+            findings.append({"type": "published", "where": a["where"], "headline": a["headline"], "cutoff": a["cutoff"].isoformat(), "published": str(a["published"])})
+
+    if items:
+        idx, dates, day_precision, spans = extract_dates([a["headline"] + "\n" + a["content"] for a in items])
+        cutoffs = np.array([a["cutoff"].date() for a in items], dtype="datetime64[D]")[idx]
+        after = np.where(
+            day_precision,
+            dates > cutoffs,
+            dates.astype("datetime64[M]") > cutoffs.astype("datetime64[M]"),
+        )
+        for j in np.flatnonzero(after):
+            a = items[idx[j]]
+            findings.append({"type": "mention", "where": a["where"], "headline": a["headline"], "cutoff": a["cutoff"].isoformat(), "mention": spans[j]})
+
+    counts = {t: sum(1 for f in findings if f["type"] == t) for t in ("pattern", "published", "mention")}
+    return {"run": run_dir, "articles": len(items), "counts": counts, "findings": findings}
+
+
+def find_runs(roots: List[str]) -> List[str]:
+    runs = []
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            if "experiment.jsonl" in filenames or "raw_data" in dirnames:
+                runs.append(dirpath)
+                dirnames[:] = [d for d in dirnames if d != "raw_data"]
+    return sorted(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit stored runs for temporal leakage")
+    parser.add_argument("roots", nargs="*", default=["runs"], help="Run directories or trees to scan (default: runs/)")
+    parser.add_argument("--leak-patterns", action="append", default=None, help="Extra leak pattern pack file or directory, loaded with the bundled packs (repeatable)")
+    parser.add_argument("--no-default-leak-patterns", action="store_true", help="Do not load the bundled leak pattern packs")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", type=str, default=None, help="Write the full report to this file")
+    parser.add_argument("--show", type=int, default=5, help="Findings to print per run")
+    args = parser.parse_args()
+
+    runs = find_runs(args.roots)
+    if not runs:
+        print("No runs found.")
+        return
+
+    started = datetime.now()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        reports = list(pool.map(audit_run, runs, [args.leak_patterns] * len(runs), [not args.no_default_leak_patterns] * len(runs), chunksize=4))
+
+    flagged = 0
+    for report in reports:
+        counts = report["counts"]
+        if not any(counts.values()):
+            continue
+        flagged += 1
+        print(f"\n{report['run']}  ({report['articles']} articles) pattern={counts['pattern']} published={counts['published']} mention={counts['mention']}")
+        for f in report["findings"][:args.show]:
+            detail = f.get("phrase") or f.get("published") or f.get("mention")
+            print(f"  [{f['type']}] {f['where']} cutoff {f['cutoff'][:10]} '{detail}': {f['headline'][:80]}")
+
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"\nAudited {len(runs)} run(s), {sum(r['articles'] for r in reports)} article(s) in {elapsed:.1f}s; {flagged} run(s) with findings.")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2, default=str)
+        print(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
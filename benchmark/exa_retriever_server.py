@@ -14,15 +14,31 @@ document format, and return them.
 Run before benchmark:
     python benchmark/exa_retriever_server.py
 
+Or offline, against a local index built with src/data_loaders/vector_index.py:
+    RETRIEVER_BACKEND=dense python benchmark/exa_retriever_server.py
+
 Or from the Colab notebook (background thread).
 """
 
 import os
+import sys
 import uvicorn
 from typing import List, Optional
 from fastapi import FastAPI
 from pydantic import BaseModel
 
+# Repo root on the path for the local dense index backend
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# "exa" (live web search) or "dense" (local date-sharded vector index)
+BACKEND = os.environ.get("RETRIEVER_BACKEND", "exa")
+VECTOR_INDEX_DIR = os.environ.get("VECTOR_INDEX_DIR", os.path.join(REPO_ROOT, "cache", "vector_index"))
+
+# Characters of article text per document (Exa truncates server-side)
+MAX_CONTENT = 2000
+
 # ---------------------------------------------------------------------------
 # Request / Response schemas matching Search-R1's retriever contract
 # ---------------------------------------------------------------------------
@@ -54,8 +70,7 @@ def exa_search(query: str, topk: int, api_key: str) -> List[DocumentResult]:
         response = exa.search_and_contents(
             query,
             num_results=topk,
-            text=True,
-            highlights=True,
+            text={"max_characters": MAX_CONTENT},
         )
 
         docs = []
@@ -68,7 +83,7 @@ def exa_search(query: str, topk: int, api_key: str) -> List[DocumentResult]:
             # Search-R1 exact corpus format used in _passages2string():
             # first line = title, rest = body text
             # infer.py does: title = content.split("\n")[0]; text = "\n".join(content.split("\n")[1:])
-            contents = f'"{title}"\n{text[:2000]}'
+            contents = f'"{title}"\n{text[:MAX_CONTENT]}'
 
             docs.append(DocumentResult(
                 document={"contents": contents},
@@ -82,6 +97,30 @@ def exa_search(query: str, topk: int, api_key: str) -> List[DocumentResult]:
         return []
 
 
+# ---------------------------------------------------------------------------
+# Local dense index (RETRIEVER_BACKEND=dense)
+# ---------------------------------------------------------------------------
+
+_vector_index = None
+
+
+def dense_search(query: str, topk: int) -> List[DocumentResult]:
+    global _vector_index
+    try:
+        from src.data_loaders.vector_index import VectorIndex
+        if _vector_index is None:
+            _vector_index = VectorIndex(VECTOR_INDEX_DIR)
+
+        return [
+            DocumentResult(document={"contents": f'"{r["headline"]}"\n{r["content"][:MAX_CONTENT]}'}, score=r["score"])
+            for r in _vector_index.search(query, k=topk)
+        ]
+
+    except Exception as e:
+        print(f"[ExaServer] Dense search error for query '{query[:60]}': {e}")
+        return []
+
+
 # ---------------------------------------------------------------------------
 # FastAPI app
 # ---------------------------------------------------------------------------
@@ -91,6 +130,9 @@ app = FastAPI(title="Exa Retriever Server")
 
 @app.post("/retrieve", response_model=RetrieveResponse)
 async def retrieve(request: RetrieveRequest):
+    if BACKEND == "dense":
+        return RetrieveResponse(result=[dense_search(query, topk=request.topk) for query in request.queries])
+
     api_key = os.environ.get("EXA_API_KEY", "")
     if not api_key:
         return RetrieveResponse(result=[[] for _ in request.queries])
@@ -105,7 +147,7 @@ async def retrieve(request: RetrieveRequest):
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "backend": "exa"}
+    return {"status": "ok", "backend": BACKEND}
 
 
 # ---------------------------------------------------------------------------
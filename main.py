@@ -5,12 +5,21 @@ import re
 from datetime import datetime, timedelta
 from src.core.environment import MarketEnvironment
 from src.agents.llm_agent import SequentialLLMAgent
+from src.agents.conversational_agent import ConversationalLLMAgent
 from src.agents.openai_provider import OpenAIProvider
+from src.agents.async_openai_provider import AsyncOpenAIProvider
 from src.agents.mock_provider import MockLLMProvider
+from src.agents.cached_provider import CachedLLMProvider
 from src.data_loaders.kalshi import KalshiDataProvider
 from src.data_loaders.polymarket import PolymarketDataProvider
 from src.data_loaders.context import ContextDataProvider
+from src.data_loaders.news_cache import NewsCache
+from src.data_loaders.leak_guard import LeakGuard
+from src.data_loaders.event_family import EventFamilyRegistry
+from src.data_loaders.local_corpus import DEFAULT_CORPUS_INDEX
+from src.data_loaders.vector_index import DEFAULT_VECTOR_INDEX
 from src.utils.logger import ExperimentLogger
+from src.utils.image_cache import ImageCache
 
 def load_env():
     """Simple manual .env loader to avoid extra dependencies."""
@@ -34,9 +43,25 @@ def slugify(text: str) -> str:
     text = re.sub(r'^-+|-+$', '', text)
     return text
 
-def run_simulation(args, market_ticker, market_question, start_date, context_window, run_dir, metadata=None):
-    """Orchestrates a single simulation run."""
-    print(f"\n--- Initializing Simulation: {market_ticker} ---")
+def build_context_provider(args):
+    """News/context provider configured from the CLI flags."""
+    return ContextDataProvider(
+        sources=args.sources.split(","),
+        query_template="{ticker} {question} news",
+        max_content=args.max_content,
+        news_cache=None if args.no_news_cache else NewsCache(),
+        incremental=args.incremental_news,
+        default_source_timeout=args.source_timeout,
+        leak_guard=LeakGuard.from_paths(args.leak_patterns, include_default=not args.no_default_leak_patterns),
+        retrieval=args.retrieval,
+        min_articles=args.min_articles,
+        corpus_dir=args.corpus_dir,
+        vector_dir=args.vector_dir,
+        event_families=EventFamilyRegistry() if args.event_families else None
+    )
+
+def build_environment(args, market_ticker, market_question, start_date, context_window, run_dir, metadata, context_provider):
+    """Market provider, agent, logger and environment for one run."""
     end_date = start_date + timedelta(days=args.days)
     
     # 1. Initialize Data Providers
@@ -45,13 +70,10 @@ def run_simulation(args, market_ticker, market_question, start_date, context_win
         market_provider = KalshiDataProvider(api_key=kalshi_key)
     else:
         market_provider = PolymarketDataProvider()
+        market_provider.chart_mode = args.chart_mode
     
-    # Context (Exa/Tavily)
-    context_provider = ContextDataProvider(
-        sources=["exa", "tavily"],
-        query_template=f"{{ticker}} {market_question} news",
-        max_content=args.max_content
-    )
+    # Context is built by the caller (it may be shared across runs)
+    context_provider.register_market(market_ticker, market_question)
     
     # 2. Initialize Agent
     if args.mock:
@@ -61,15 +83,46 @@ def run_simulation(args, market_ticker, market_question, start_date, context_win
         if not openai_key:
             print("Error: OPENAI_API_KEY not found. Set it or use --mock.")
             sys.exit(1)
-        llm_provider = OpenAIProvider(api_key=openai_key)
+        image_cache = None if args.no_image_cache else ImageCache(negative_ttl=args.image_cache_ttl * 3600)
+        provider_options = dict(
+            api_key=openai_key,
+            image_cache=image_cache,
+            image_deadline=args.image_deadline,
+            image_detail=args.image_detail
+        )
+        if args.async_llm:
+            llm_provider = AsyncOpenAIProvider(rpm=args.rpm, tpm=args.tpm, max_concurrency=args.max_concurrency, **provider_options)
+        else:
+            llm_provider = OpenAIProvider(**provider_options)
+    if args.llm_cache:
+        llm_provider = CachedLLMProvider(llm_provider, max_bytes=int(args.llm_cache_mb * 1024 * 1024))
         
-    agent = SequentialLLMAgent(llm_provider, market_question=market_question, max_content=args.max_content)
+    if args.agent == "conversational":
+        agent = ConversationalLLMAgent(
+            llm_provider,
+            market_question=market_question,
+            max_content=args.max_content,
+            relevance_ranking=not args.no_relevance_ranking,
+            min_relevance=args.min_relevance,
+            compact_tokens=args.compact_tokens
+        )
+    else:
+        agent = SequentialLLMAgent(
+            llm_provider,
+            market_question=market_question,
+            max_content=args.max_content,
+            relevance_ranking=not args.no_relevance_ranking,
+            min_relevance=args.min_relevance,
+            prompt_layout=args.prompt_layout,
+            prefix_block_days=args.prefix_block_days,
+            token_budget=args.token_budget
+        )
     
     # 3. Initialize Logger
     logger = ExperimentLogger(run_dir=run_dir, metadata=metadata)
     
-    # 4. Run Environment
-    env = MarketEnvironment(
+    # 4. Environment
+    return MarketEnvironment(
         start_date=start_date,
         end_date=end_date,
         market_provider=market_provider,
@@ -78,8 +131,20 @@ def run_simulation(args, market_ticker, market_question, start_date, context_win
         logger=logger,
         market_ids=[market_ticker],
         context_window_days=context_window,
-        run_dir=run_dir
+        run_dir=run_dir,
+        step_budget=args.step_budget
     )
+
+def run_simulation(args, market_ticker, market_question, start_date, context_window, run_dir, metadata=None, context_provider=None):
+    """Orchestrates a single simulation run."""
+    print(f"\n--- Initializing Simulation: {market_ticker} ---")
+    end_date = start_date + timedelta(days=args.days)
+
+    # Context (Exa/Tavily and/or the offline local corpus); shared across
+    # runs when sibling markets are grouped into event families
+    if context_provider is None:
+        context_provider = build_context_provider(args)
+    env = build_environment(args, market_ticker, market_question, start_date, context_window, run_dir, metadata, context_provider)
     
     print(f"Starting Simulation Period: {start_date.date()} to {end_date.date()}")
     try:
@@ -87,9 +152,50 @@ def run_simulation(args, market_ticker, market_question, start_date, context_win
     except KeyboardInterrupt:
         print("\nSimulation stopped by user.")
         return None
+
+    if context_provider.news_cache:
+        print(f"News cache: {context_provider.news_cache.stats()}")
+    if isinstance(env.agent.provider, CachedLLMProvider):
+        print(f"LLM cache: {env.agent.provider.stats()}")
     
     return env.portfolio.get_state({}).total_value
 
+def run_window_sweep(args, market_ticker, market_question, start_date, windows, run_dir, metadata=None, context_provider=None):
+    """
+    Runs one environment per context window size in lockstep. News is
+    fetched once for the largest window and narrowed by date for the others,
+    so the data cost is paid once per market. Returns {window: final value}.
+    """
+    print(f"\n--- Initializing Window Sweep: {market_ticker} (windows: {windows}) ---")
+    end_date = start_date + timedelta(days=args.days)
+
+    if context_provider is None:
+        context_provider = build_context_provider(args)
+    context_provider.fetch_window_days = max(windows)
+
+    # Largest window first: its step performs the fetch the others reuse
+    envs = {}
+    for window in sorted(windows, reverse=True):
+        window_metadata = dict(metadata or {}, context_window=window)
+        envs[window] = build_environment(args, market_ticker, market_question, start_date, window, f"{run_dir}_w{window}", window_metadata, context_provider)
+
+    print(f"Starting Simulation Period: {start_date.date()} to {end_date.date()}")
+    active = list(envs.values())
+    try:
+        while active:
+            active = [env for env in active if env.step()]
+    except KeyboardInterrupt:
+        print("\nSimulation stopped by user.")
+        return None
+
+    if context_provider.news_cache:
+        print(f"News cache: {context_provider.news_cache.stats()}")
+    for window, env in sorted(envs.items()):
+        if isinstance(env.agent.provider, CachedLLMProvider):
+            print(f"LLM cache (window {window}): {env.agent.provider.stats()}")
+
+    return {window: env.portfolio.get_state({}).total_value for window, env in sorted(envs.items())}
+
 def main():
     parser = argparse.ArgumentParser(description='Sequential Trader Simulation')
     parser.add_argument('--ticker', type=str, default="Bitcoin", help='Market Ticker or Search Query')
@@ -97,9 +203,40 @@ def main():
     parser.add_argument('--start-date', type=str, default="2024-03-01", help='Start date YYYY-MM-DD')
     parser.add_argument('--days', type=int, default=14, help='Duration in days to run the simulation')
     parser.add_argument('--window', type=int, default=None, help='Context window in days for news/data (defaults to same as --days)')
+    parser.add_argument('--windows', type=str, default=None, help='Sweep several context windows in one process, e.g. 7,14,30 (news fetched once for the largest)')
     parser.add_argument('--max-content', type=int, default=2000, help='Maximum characters per news article content')
     parser.add_argument('--mock', action='store_true', help='Use mock LLM instead of OpenAI')
     parser.add_argument('--provider', type=str, default="polymarket", choices=["kalshi", "polymarket"], help='Data provider to use')
+    parser.add_argument('--chart-mode', type=str, default="image", choices=["image", "summary"], help='Send price history as a chart image or as a compact numeric digest (text-only)')
+    parser.add_argument('--sources', type=str, default="exa,tavily", help='Comma-separated news sources: exa, tavily, web, local, dense')
+    parser.add_argument('--corpus-dir', type=str, default=DEFAULT_CORPUS_INDEX, help='Index built with `python -m src.data_loaders.local_corpus` (for --sources local)')
+    parser.add_argument('--vector-dir', type=str, default=DEFAULT_VECTOR_INDEX, help='Index built with `python -m src.data_loaders.vector_index` (for --sources dense)')
+    parser.add_argument('--retrieval', type=str, default="tiered", choices=["tiered", "deep"], help='tiered: cheap search first, deep (advanced + images) only when results are sparse; deep: always deep')
+    parser.add_argument('--min-articles', type=int, default=5, help='Clean articles needed per step before tiered retrieval escalates to deep search')
+    parser.add_argument('--event-families', action='store_true', help='Share one news retrieval per window across sibling markets (e.g. nvda-above-160 / nvda-above-170)')
+    parser.add_argument('--no-relevance-ranking', action='store_true', help='Pass every article to the prompt instead of ranking/pruning by relevance to the question')
+    parser.add_argument('--min-relevance', type=float, default=0.1, help='Drop articles scoring below this fraction of the most relevant one')
+    parser.add_argument('--agent', type=str, default="sequential", choices=["sequential", "conversational"], help='conversational: one rolling chat per run that receives only new articles and price changes each day')
+    parser.add_argument('--compact-tokens', type=int, default=6000, help='With --agent conversational, fold older turns into a bounded journal past this many tokens')
+    parser.add_argument('--token-budget', type=int, default=None, help='Input tokens per LLM call (text + images); the oldest/least relevant articles and then images are dropped to fit')
+    parser.add_argument('--prompt-layout', type=str, default="default", choices=["default", "prefix_stable"], help='prefix_stable: static text and older news first, volatile state last, so daily prompts share a cacheable prefix')
+    parser.add_argument('--prefix-block-days', type=int, default=0, help='With --prompt-layout prefix_stable, advance the timeline start every N days instead of daily, keeping up to N-1 already-seen days before the window for better prefix caching (default 0 = strict sliding window)')
+    parser.add_argument('--leak-patterns', action='append', default=None, help='Extra leak pattern pack file or directory, loaded with the bundled packs (repeatable)')
+    parser.add_argument('--no-default-leak-patterns', action='store_true', help='Do not load the bundled leak pattern packs (only --leak-patterns)')
+    parser.add_argument('--step-budget', type=float, default=None, help='Seconds per simulation step; slow stages degrade to cached/partial results (logged) instead of blocking')
+    parser.add_argument('--source-timeout', type=float, default=30.0, help='Seconds each news source gets per step before it is skipped')
+    parser.add_argument('--incremental-news', action='store_true', help='Only fetch the newly exposed day of each sliding news window')
+    parser.add_argument('--no-news-cache', action='store_true', help='Disable the on-disk search result cache (cache/news)')
+    parser.add_argument('--no-image-cache', action='store_true', help='Disable the on-disk news image cache (cache/images)')
+    parser.add_argument('--image-deadline', type=float, default=10.0, help='Seconds allowed for fetching/encoding all images of one LLM call')
+    parser.add_argument('--image-detail', type=str, default="low", choices=["low", "high"], help='Vision detail level; images are downscaled to match')
+    parser.add_argument('--async-llm', action='store_true', help='Send OpenAI requests through one shared async client with client-side RPM/TPM limiting and retry-after aware retries')
+    parser.add_argument('--rpm', type=float, default=500, help='With --async-llm: account requests-per-minute limit')
+    parser.add_argument('--tpm', type=float, default=30000, help='With --async-llm: account tokens-per-minute limit')
+    parser.add_argument('--max-concurrency', type=int, default=8, help='With --async-llm: maximum outstanding requests')
+    parser.add_argument('--llm-cache', action='store_true', help='Reuse LLM responses for identical prompts and images from the on-disk cache (cache/llm)')
+    parser.add_argument('--llm-cache-mb', type=float, default=512, help='Size cap of the LLM response cache; least recently used entries are evicted')
+    parser.add_argument('--image-cache-ttl', type=float, default=24, help='Hours to remember failed image URLs before retrying')
     
     # Hindsight Options
     parser.add_argument('--hindsight-query', type=str, help='Search for archived/closed markets by keyword')
@@ -166,6 +303,8 @@ def main():
 
     print(f"Found {len(targets)} targets for simulation.")
 
+    shared_context = build_context_provider(args) if args.event_families else None
+
     # Loop through targets
     for target in targets:
         context_window = args.window if args.window is not None else args.days
@@ -177,6 +316,26 @@ def main():
         run_id = f"{question_slug}_{timestamp}"
         run_dir = os.path.join("runs", ticker_slug, run_id)
         
+        if args.windows:
+            windows = [int(w) for w in args.windows.split(",")]
+            final_vals = run_window_sweep(
+                args=args,
+                market_ticker=target['ticker'],
+                market_question=target['question'],
+                start_date=target['start_date'],
+                windows=windows,
+                run_dir=run_dir,
+                metadata=target.get('metadata'),
+                context_provider=shared_context
+            )
+            if final_vals is not None:
+                print(f"\n--- Window Sweep Complete ---")
+                print(f"Ticker: {target['ticker']}")
+                for window, final_val in final_vals.items():
+                    print(f"Window {window}d: Final Value ${final_val:.2f} | Log: {os.path.join(f'{run_dir}_w{window}', 'experiment.jsonl')}")
+                print(f"---------------------------\n")
+            continue
+
         final_val = run_simulation(
             args=args,
             market_ticker=target['ticker'],
@@ -184,7 +343,8 @@ def main():
             start_date=target['start_date'],
             context_window=context_window,
             run_dir=run_dir,
-            metadata=target.get('metadata')
+            metadata=target.get('metadata'),
+            context_provider=shared_context
         )
         
         if final_val is not None:
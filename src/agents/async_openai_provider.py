@@ -0,0 +1,168 @@
+import os
+import asyncio
+import random
+import threading
+from typing import Dict, List, Optional
+from openai import AsyncOpenAI, APIConnectionError, InternalServerError, RateLimitError
+from src.agents.openai_provider import OpenAIProvider
+from src.agents.token_budget import count_tokens, image_tokens
+from src.utils.rate_limit import RateLimiter
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_guard = threading.Lock()
+_accounts: Dict[str, "_Account"] = {}
+
+
+def _shared_loop() -> asyncio.AbstractEventLoop:
+    """Event loop (daemon thread) that owns every async client, limiter and semaphore."""
+    global _loop
+    with _loop_guard:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="openai-async", daemon=True).start()
+        return _loop
+
+
+class _Account:
+    """One client, rate limiter and concurrency cap per API key, shared by all providers using it."""
+
+    def __init__(self, api_key: Optional[str], rpm: float, tpm: float, max_concurrency: int):
+        # Retries are ours (they must go through the rate limiter)
+        self.client = AsyncOpenAI(api_key=api_key, max_retries=0)
+        self.limiter = RateLimiter(rpm, tpm)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+class AsyncOpenAIProvider(OpenAIProvider):
+    """
+    OpenAIProvider on a shared AsyncOpenAI client with client-side rate limiting.
+
+    Every request waits for the account's requests-per-minute and
+    tokens-per-minute buckets (prompt tokens estimated locally plus
+    `completion_tokens`, reconciled with the reported usage) and holds one
+    of `max_concurrency` slots. 429s pause the whole account for their
+    retry-after; 429/5xx/connection errors are retried up to `max_retries`
+    times with backoff. Providers with the same API key share the client,
+    limits and slots (the first one sets them), so concurrent simulations
+    saturate but never exceed the account limits. With a step deadline set,
+    waits for a slot, the limiter and retries are bounded by its remaining
+    time; a call that cannot be made in time raises TimeoutError (the
+    agent falls back to HOLD) and is recorded as an "llm" degradation.
+
+    Use `agenerate`/`agenerate_chat` from async code; the sync
+    `generate`/`generate_chat` block on the shared loop, so existing agents
+    running in threads share the limits too.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "gpt-4o",
+        api_key: Optional[str] = None,
+        rpm: float = 500,
+        tpm: float = 30000,
+        max_concurrency: int = 8,
+        max_retries: int = 5,
+        completion_tokens: int = 400,
+        **kwargs
+    ):
+        super().__init__(model_name=model_name, api_key=api_key, **kwargs)
+        self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        # Reserved per request for the reply until the actual usage is known
+        self.completion_tokens = completion_tokens
+
+    def _account(self) -> _Account:
+        # Only called on the shared loop, so no locking is needed
+        key = self.api_key or ""
+        if key not in _accounts:
+            _accounts[key] = _Account(self.api_key, self.rpm, self.tpm, self.max_concurrency)
+        return _accounts[key]
+
+    def _estimate_tokens(self, chat: List[dict]) -> int:
+        tokens = self.completion_tokens
+        for message in chat:
+            parts = message["content"] if isinstance(message["content"], list) else [{"type": "text", "text": message["content"]}]
+            for part in parts:
+                if part["type"] == "text":
+                    tokens += count_tokens(part["text"], self.model_name)
+                else:
+                    tokens += image_tokens(self.image_detail)
+        return tokens
+
+    async def _chat(self, system_prompt: str, messages: List[Dict[str, str]], image_urls: Optional[List[str]] = None) -> str:
+        account = self._account()
+        # Image fetching/encoding is blocking; keep it off the loop
+        chat = await asyncio.get_running_loop().run_in_executor(None, self._build_messages, system_prompt, messages, image_urls)
+        estimate = self._estimate_tokens(chat)
+
+        try:
+            await asyncio.wait_for(account.semaphore.acquire(), self._time_left())
+        except asyncio.TimeoutError:
+            self._out_of_time("no request slot freed up")
+        try:
+            for attempt in range(self.max_retries + 1):
+                if not await account.limiter.acquire(estimate, timeout=self._time_left()):
+                    self._out_of_time("rate limit wait exceeds the step budget")
+                try:
+                    response = await account.client.chat.completions.create(
+                        model=self.model_name,
+                        messages=chat,
+                        temperature=self.temperature
+                    )
+                except (RateLimitError, InternalServerError, APIConnectionError) as e:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = _retry_after(e) or min(60.0, 2.0 ** attempt) * (0.5 + random.random() / 2)
+                    if isinstance(e, RateLimitError):
+                        account.limiter.pause(delay)
+                    left = self._time_left()
+                    if left is not None and delay >= left:
+                        self._out_of_time(f"{type(e).__name__}, retry in {delay:.1f}s exceeds the step budget")
+                    print(f"[OpenAI] {type(e).__name__}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                    await asyncio.sleep(delay)
+                    continue
+
+                self._record_usage(response)
+                if response.usage:
+                    account.limiter.reconcile(estimate, response.usage.total_tokens)
+                return response.choices[0].message.content
+        finally:
+            account.semaphore.release()
+
+    def _time_left(self) -> Optional[float]:
+        """Seconds left in the step budget (None = unbounded)."""
+        return self.deadline.remaining() if self.deadline else None
+
+    def _out_of_time(self, detail: str):
+        self.deadline.degrade("llm", f"{detail}; no answer")
+        raise TimeoutError(f"LLM call abandoned: {detail}")
+
+    async def agenerate_chat(self, system_prompt: str, messages: List[Dict[str, str]], image_urls: Optional[List[str]] = None) -> str:
+        loop = _shared_loop()
+        if asyncio.get_running_loop() is loop:
+            return await self._chat(system_prompt, messages, image_urls)
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._chat(system_prompt, messages, image_urls), loop))
+
+    async def agenerate(self, system_prompt: str, user_prompt: str, image_urls: Optional[List[str]] = None) -> str:
+        return await self.agenerate_chat(system_prompt, [{"role": "user", "content": user_prompt}], image_urls)
+
+    def generate_chat(self, system_prompt: str, messages: List[Dict[str, str]], image_urls: Optional[List[str]] = None) -> str:
+        return asyncio.run_coroutine_threadsafe(self._chat(system_prompt, messages, image_urls), _shared_loop()).result()
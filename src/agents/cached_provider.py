@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from src.core.llm_interface import LLMProvider
+from src.utils.storage import atomic_write_json, read_json, file_lock, sha256_hex
+
+DEFAULT_LLM_CACHE = os.path.join("cache", "llm")
+
+# Provider settings that change what the model sees or how it samples
+_PARAM_ATTRS = ("temperature", "image_detail", "image_format", "image_max_bytes", "max_images")
+
+
+class CachedLLMProvider(LLMProvider):
+    """
+    Disk-backed response cache around any LLMProvider.
+
+    The key is a hash of the model name, sampling/image parameters, both
+    prompts and the images actually sent: providers that prepare images
+    themselves (OpenAIProvider) fetch and encode them before the lookup, so
+    a call that lost images to a deadline or a failed download is keyed by
+    what it saw, and each image by its content hash; the provider then
+    sends those payloads without preparing them again. For other
+    providers, local files are hashed and remote URLs are keyed by URL.
+    Only deterministic calls (temperature 0) are cached unless
+    `cache_sampled=True`. Concurrent identical calls, in this process or in
+    parallel runs, are collapsed into one request through a per-key file
+    lock. The cache is capped at `max_bytes`; the least recently used
+    entries are evicted first.
+    """
+
+    def __init__(self, provider: LLMProvider, root: str = DEFAULT_LLM_CACHE, max_bytes: int = 512 * 1024 * 1024, cache_sampled: bool = False):
+        self.provider = provider
+        self.root = root
+        self.max_bytes = max_bytes
+        self.cache_sampled = cache_sampled
+        self.hits = 0
+        self.misses = 0
+        # Usage of the last call; None when it was served from this cache
+        self.last_usage = None
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        self._size = sum(e.stat().st_size for e in self._entries())
+
+    # The environment sets a per-step deadline on the provider it talks to
+    @property
+    def deadline(self):
+        return getattr(self.provider, "deadline", None)
+
+    @deadline.setter
+    def deadline(self, value):
+        if hasattr(self.provider, "deadline"):
+            self.provider.deadline = value
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything else (model_name, last_usage, ...) comes from the wrapped provider
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def _entries(self):
+        for sub in os.scandir(self.root):
+            if sub.is_dir() and not sub.name.startswith("."):
+                yield from (e for e in os.scandir(sub.path) if e.name.endswith(".json"))
+
+    @staticmethod
+    def _image_fingerprint(src: str) -> str:
+        if src.startswith("data:"):
+            return "sha256:" + sha256_hex(src.encode("utf-8"))
+        if os.path.exists(src):
+            h = hashlib.sha256()
+            with open(src, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            return "sha256:" + h.hexdigest()
+        return "url:" + src
+
+    def key(self, system_prompt: str, user_prompt: Union[str, List[Dict[str, str]]], image_urls: Optional[List[str]] = None) -> str:
+        """`user_prompt` is the prompt text, or the message list of a chat call."""
+        params: Dict[str, Any] = {attr: getattr(self.provider, attr) for attr in _PARAM_ATTRS if hasattr(self.provider, attr)}
+        raw = json.dumps([
+            getattr(self.provider, "model_name", type(self.provider).__name__),
+            params,
+            system_prompt,
+            user_prompt,
+            [self._image_fingerprint(u) for u in image_urls or [] if u],
+        ], sort_keys=True, default=str)
+        return sha256_hex(raw.encode("utf-8"))
+
+    def _sent_images(self, image_urls: Optional[List[str]]) -> Optional[List[str]]:
+        """Encoded payloads of the images the wrapped provider would send; it sends them as-is."""
+        prepare = getattr(self.provider, "_prepare_images", None)
+        if prepare is None or not image_urls:
+            return image_urls
+        return prepare(image_urls)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def _lock_path(self, key: str) -> str:
+        return os.path.join(self.root, ".locks", f"{key[:3]}.lock")
+
+    def _get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        entry = read_json(path)
+        if entry is None:
+            return None
+        try:
+            os.utime(path)  # Recency for LRU eviction
+        except OSError:
+            pass
+        return entry.get("response")
+
+    def generate(self, system_prompt: str, user_prompt: str, image_urls: Optional[List[str]] = None) -> str:
+        return self._cached(
+            lambda images: self.key(system_prompt, user_prompt, images),
+            lambda images: self.provider.generate(system_prompt, user_prompt, images),
+            image_urls,
+        )
+
+    def generate_chat(self, system_prompt: str, messages: List[Dict[str, str]], image_urls: Optional[List[str]] = None) -> str:
+        return self._cached(
+            lambda images: self.key(system_prompt, messages, images),
+            lambda images: self.provider.generate_chat(system_prompt, messages, images),
+            image_urls,
+        )
+
+    def _cached(self, make_key: Callable[[Optional[List[str]]], str], call: Callable[[Optional[List[str]]], str], image_urls: Optional[List[str]]) -> str:
+        if not self.cache_sampled and getattr(self.provider, "temperature", 0.0) not in (0, 0.0, None):
+            response = call(image_urls)
+            self.last_usage = getattr(self.provider, "last_usage", None)
+            return response
+
+        images = self._sent_images(image_urls)
+        key = make_key(images)
+        response = self._get(key)
+        if response is None:
+            with file_lock(self._lock_path(key)):
+                # An identical call may have completed while we waited
+                response = self._get(key)
+                if response is None:
+                    self._count(hit=False)
+                    response = call(images)
+                    self.last_usage = getattr(self.provider, "last_usage", None)
+                    self._put(key, response)
+                    return response
+        self._count(hit=True)
+        self.last_usage = None
+        return response
+
+    def _put(self, key: str, response: str):
+        path = self._path(key)
+        atomic_write_json(path, {
+            "model": getattr(self.provider, "model_name", type(self.provider).__name__),
+            "created": time.time(),
+            "response": response,
+        })
+        with self._lock:
+            self._size += os.path.getsize(path)
+            over = self._size > self.max_bytes
+        if over:
+            self._evict()
+
+    def _evict(self):
+        """Deletes least recently used entries until the cache is at 90% of its cap."""
+        entries = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in self._entries()))
+        size = sum(s for _, s, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+                size -= entry_size
+            except OSError:
+                pass
+        with self._lock:
+            self._size = size
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "size_mb": round(self._size / (1024 * 1024), 2),
+        }
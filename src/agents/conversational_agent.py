@@ -0,0 +1,210 @@
+import json
+import logging
+from typing import Dict, List, Optional
+from src.core.agent import Agent
+from src.core.types import Observation, Action, NewsItem
+from src.core.llm_interface import LLMProvider
+from src.agents.prompts import (
+    get_system_prompt,
+    CONVERSATION_SYSTEM_SUFFIX,
+    CONVERSATION_TURN_TEMPLATE,
+    JOURNAL_SYSTEM_PROMPT,
+    JOURNAL_USER_TEMPLATE,
+)
+from src.agents.llm_agent import parse_action, fallback_action
+from src.data_loaders.price_summary import format_price_summary
+from src.agents.relevance import rank_news
+from src.agents.token_budget import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationalLLMAgent(Agent):
+    """
+    Stateful variant of SequentialLLMAgent that keeps a rolling conversation.
+
+    The first turn carries the full news timeline; each later turn carries
+    only articles not shown before and the price change since the previous
+    decision, so daily input grows with new information rather than with
+    the window length. Once the conversation exceeds `compact_tokens`, all
+    but the last `keep_turns` days are folded into a journal of at most
+    `journal_words` words (written by the LLM, or extracted from the past
+    decisions if that call fails) that replaces them.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        market_question: str,
+        max_content: int = 2000,
+        relevance_ranking: bool = True,
+        min_relevance: float = 0.1,
+        compact_tokens: int = 6000,
+        keep_turns: int = 2,
+        journal_words: int = 400
+    ):
+        self.provider = provider
+        self.market_question = market_question
+        self.max_content = max_content
+        self.relevance_ranking = relevance_ranking
+        self.min_relevance = min_relevance
+        self.compact_tokens = compact_tokens
+        self.keep_turns = keep_turns
+        self.journal_words = journal_words
+
+        # Conversation turns ({"role", "content", "date"}); older ones live in the journal
+        self.history: List[Dict[str, str]] = []
+        self.journal = ""
+        self._seen: set = set()
+        self._last_prices: Dict[str, float] = {}
+        self._last_date: Optional[str] = None
+        # Prompt size / provider usage of the last call, logged by the environment
+        self.last_step_info: Optional[dict] = None
+
+    @staticmethod
+    def _news_key(item: NewsItem):
+        return item.metadata.get("article_id") or (item.headline, item.timestamp.isoformat())
+
+    def _count_tokens(self, messages: List[Dict[str, str]]) -> int:
+        model = getattr(self.provider, "model_name", "gpt-4o")
+        return sum(count_tokens(m["content"], model) for m in messages)
+
+    def _format_market_data(self, observation: Observation, first_turn: bool) -> str:
+        market_strs = []
+        for mid, snap in observation.market_snapshots.items():
+            change = ""
+            if mid in self._last_prices:
+                change = f" ({snap.last_price - self._last_prices[mid]:+.2f} since {self._last_date})"
+            market_strs.append(
+                f"ID: {mid} | Price: {snap.last_price:.2f}{change} | Bid: {snap.best_bid:.2f} | Ask: {snap.best_ask:.2f} | Vol: {snap.volume}"
+            )
+            # The lookback digest only goes out once; later turns carry the daily change
+            if first_turn and snap.chart_data and "daily_ohlc" in snap.chart_data:
+                market_strs.append(format_price_summary(snap.chart_data))
+        return "\n".join(market_strs)
+
+    def _format_news(self, news: List[NewsItem]) -> str:
+        news_by_date: Dict[str, List[str]] = {}
+        for n in news:
+            sources = ", ".join(n.metadata.get("sources", [n.source]))
+            news_by_date.setdefault(n.timestamp.strftime("%Y-%m-%d"), []).append(
+                f"[{sources}] {n.headline}: {n.content[:self.max_content]}"
+            )
+        news_strs = []
+        for d in sorted(news_by_date):
+            news_strs.append(f"--- news from {d} ---")
+            news_strs.extend(news_by_date[d])
+            news_strs.append("")
+        return "\n".join(news_strs)
+
+    def _context_messages(self) -> List[Dict[str, str]]:
+        messages = [{"role": "user", "content": f"[JOURNAL]\n{self.journal}"}] if self.journal else []
+        return messages + self.history
+
+    def act(self, observation: Observation, market_rules: str = "None Provided") -> Action:
+        first_turn = not self.history and not self.journal
+        date = observation.timestamp.strftime("%Y-%m-%d")
+
+        # 1. Delta observation: articles not shown in an earlier turn
+        candidates = [n for n in observation.news if self._news_key(n) not in self._seen]
+        fresh = candidates
+        if self.relevance_ranking and fresh:
+            ranked = rank_news(fresh, self.market_question, market_rules, min_relevance=self.min_relevance)
+            if len(ranked) < len(fresh):
+                print(f"DEBUG: Dropped {len(fresh) - len(ranked)} low-relevance article(s)")
+            fresh = [item for item, _ in sorted(ranked, key=lambda x: -x[1])]
+
+        if first_turn:
+            news_header = "PAST NEWS TIMELINE"
+            news_str = self._format_news(fresh) or "No news available for the given timeframe."
+        else:
+            news_header = f"NEW NEWS SINCE {self._last_date}"
+            news_str = self._format_news(fresh) or "No new articles since your previous decision."
+
+        user_turn = CONVERSATION_TURN_TEMPLATE.format(
+            date=date,
+            cash=observation.portfolio.cash,
+            positions=str(observation.portfolio.positions),
+            market_data_str=self._format_market_data(observation, first_turn),
+            news_header=news_header,
+            news_str=news_str,
+            market_question=self.market_question
+        )
+
+        # Charts first so the image cap never cuts them, then images of the new articles
+        image_urls = [snap.image_url for snap in observation.market_snapshots.values() if snap.image_url]
+        image_urls.extend(n.image_url for n in fresh if n.image_url)
+
+        system_prompt = get_system_prompt(self.market_question, market_rules).replace(
+            "{{window_days}}", str(observation.context_window_days)
+        ) + CONVERSATION_SYSTEM_SUFFIX
+        messages = self._context_messages() + [{"role": "user", "content": user_turn}]
+
+        try:
+            response_text = self.provider.generate_chat(system_prompt, messages, image_urls)
+            usage = getattr(self.provider, "last_usage", None)
+            action = parse_action(response_text)
+        except Exception as e:
+            logger.error(f"Failed to generate/parse action: {e}")
+            # Nothing is recorded, so the same articles are offered again next turn
+            self.last_step_info = {"prompt_layout": "conversational", "error": str(e)}
+            return fallback_action(e)
+
+        self.history.append({"role": "user", "content": user_turn, "date": date})
+        self.history.append({"role": "assistant", "content": response_text, "date": date})
+        # Pruned articles count as seen too; they are not re-ranked every day
+        self._seen.update(self._news_key(n) for n in candidates)
+        self._last_prices = {mid: snap.last_price for mid, snap in observation.market_snapshots.items()}
+        self._last_date = date
+
+        compacted = self._maybe_compact()
+        self.last_step_info = {
+            "prompt_layout": "conversational",
+            "prompt_chars": len(system_prompt) + sum(len(m["content"]) for m in messages),
+            "turn_chars": len(user_turn),
+            "new_articles": len(fresh),
+            "history_turns": len(self.history) // 2,
+            "journal_chars": len(self.journal),
+            "compacted_turns": compacted,
+            "usage": usage
+        }
+        return action
+
+    def _maybe_compact(self) -> int:
+        """Folds old turns into the journal once the conversation exceeds `compact_tokens`. Returns the days folded."""
+        keep = 2 * self.keep_turns
+        if self._count_tokens(self._context_messages()) <= self.compact_tokens or len(self.history) <= keep:
+            return 0
+
+        split = len(self.history) - keep
+        old, self.history = self.history[:split], self.history[split:]
+        excerpt = "\n\n".join(f"[{m['role'].upper()} {m['date']}]\n{m['content']}" for m in old)
+        try:
+            journal = self.provider.generate(
+                JOURNAL_SYSTEM_PROMPT.format(market_question=self.market_question, max_words=self.journal_words),
+                JOURNAL_USER_TEMPLATE.format(journal=self.journal or "(empty)", excerpt=excerpt)
+            )
+        except Exception as e:
+            logger.error(f"Journal compaction failed, keeping past decisions only: {e}")
+            journal = "\n".join(filter(None, [self.journal, self._decision_log(old)]))
+
+        # Bounded regardless of what the model returns; the oldest entries go first
+        words = journal.split()
+        if len(words) > self.journal_words:
+            journal = "... " + " ".join(words[-self.journal_words:])
+        self.journal = journal.strip()
+        print(f"[Journal] Compacted {len(old) // 2} turn(s) into {len(self.journal)} chars")
+        return len(old) // 2
+
+    @staticmethod
+    def _decision_log(turns: List[Dict[str, str]]) -> str:
+        lines = []
+        for m in turns:
+            if m["role"] != "assistant":
+                continue
+            try:
+                data = json.loads(m["content"].replace("```json", "").replace("```", "").strip())
+                lines.append(f"{m['date']}: {data['action']} x{data['quantity']} at belief {float(data['belief_probability']):.2f}: {data['reasoning']}")
+            except (ValueError, KeyError, TypeError):
+                continue
+        return "\n".join(lines)
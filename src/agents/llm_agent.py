@@ -1,18 +1,69 @@
 import json
 import logging
-from typing import Optional
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
 from src.core.agent import Agent
 from src.core.types import Observation, Action, TradeType
 from src.core.llm_interface import LLMProvider
-from src.agents.prompts import get_system_prompt, USER_PROMPT_TEMPLATE
+from src.agents.prompts import get_system_prompt, USER_PROMPT_TEMPLATE, PREFIX_STABLE_USER_TEMPLATE
+from src.data_loaders.price_summary import format_price_summary
+from src.agents.relevance import rank_news
+from src.agents.token_budget import BudgetItem, BudgetReport, TokenBudget, count_tokens, image_size, image_tokens
 
 logger = logging.getLogger(__name__)
 
+def parse_action(response_text: str) -> Action:
+    """Parses the model's JSON decision into an Action."""
+    # Basic cleanup to handle markdown fences if the model adds them
+    clean_text = response_text.replace("```json", "").replace("```", "").strip()
+    data = json.loads(clean_text)
+    
+    return Action(
+        action_type=TradeType(data["action"]),
+        market_id=data["market_id"],
+        quantity=int(data["quantity"]),
+        reasoning=data["reasoning"],
+        belief=float(data["belief_probability"])
+    )
+
+def fallback_action(error: Exception) -> Action:
+    """HOLD taken when the LLM call or its parsing fails."""
+    return Action(
+        action_type=TradeType.HOLD,
+        market_id="error_fallback",
+        quantity=0,
+        reasoning=f"Error in LLM processing: {str(error)}",
+        belief=0.5
+    )
+
 class SequentialLLMAgent(Agent):
-    def __init__(self, provider: LLMProvider, market_question: str, max_content: int = 2000):
+    def __init__(
+        self,
+        provider: LLMProvider,
+        market_question: str,
+        max_content: int = 2000,
+        relevance_ranking: bool = True,
+        min_relevance: float = 0.1,
+        prompt_layout: str = "default",
+        prefix_block_days: int = 0,
+        token_budget: Optional[int] = None
+    ):
         self.provider = provider
         self.market_question = market_question
         self.max_content = max_content
+        # BM25 ranking against the question/rules: drops off-topic articles
+        # and orders each day's news by relevance
+        self.relevance_ranking = relevance_ranking
+        self.min_relevance = min_relevance
+        # "default" or "prefix_stable" (see _prefix_stable_prompt)
+        self.prompt_layout = prompt_layout
+        self.prefix_block_days = prefix_block_days
+        self._frozen_days: Dict[str, Tuple[frozenset, str]] = {}  # date -> (article lines, block)
+        self._origin = None
+        # Input tokens per call (None = unbounded); see _apply_token_budget
+        self.token_budget = token_budget
+        # Prompt size / provider usage of the last call, logged by the environment
+        self.last_step_info: Optional[dict] = None
 
     def act(self, observation: Observation, market_rules: str = "None Provided") -> Action:
         # 1. Format Market Data
@@ -21,43 +72,86 @@ class SequentialLLMAgent(Agent):
             market_strs.append(
                 f"ID: {mid} | Price: {snap.last_price:.2f} | Bid: {snap.best_bid:.2f} | Ask: {snap.best_ask:.2f} | Vol: {snap.volume}"
             )
+            # Text-only chart mode: numeric digest of the lookback window instead of a PNG
+            if snap.chart_data and "daily_ohlc" in snap.chart_data:
+                market_strs.append(format_price_summary(snap.chart_data))
         market_data_str = "\n".join(market_strs)
 
         # 2. Format News and collect all images
-        # 2a. Group news by Date for the 14-day timeline
-        news_by_date = {}
-        image_urls: list = []  # News images collected for multimodal context
-        
-        for n in observation.news:
-            date_str = n.timestamp.strftime("%Y-%m-%d")
-            if date_str not in news_by_date:
-                news_by_date[date_str] = []
-            news_by_date[date_str].append(f"[{n.source}] {n.headline}: {n.content[:self.max_content]}")
-                
-        # Format the grouped string
-        news_strs = []
-        for d in sorted(news_by_date.keys()):
-            news_strs.append(f"--- news from {d} ---")
-            news_strs.extend(news_by_date[d])
-            news_strs.append("") # spacer
-
-        news_str = "\n".join(news_strs) if news_strs else "No news available for the given timeframe."
+        news = observation.news
+        if self.relevance_ranking:
+            ranked = rank_news(news, self.market_question, market_rules, min_relevance=self.min_relevance)
+            if len(ranked) < len(news):
+                print(f"DEBUG: Dropped {len(news) - len(ranked)} low-relevance article(s)")
+            # Most relevant first; the grouping below keeps this order within each date
+            news = [item for item, _ in sorted(ranked, key=lambda x: -x[1])]
 
-        # 2b. Market chart images (local .png files) -> Priority #1
+        # 2a. Images: market charts (local .png files) -> Priority #1
         # We append these FIRST so they are never cut off by the image cap
+        image_urls: list = []  # News images collected for multimodal context
         for mid, snap in observation.market_snapshots.items():
             if snap.image_url:
                 image_urls.append(snap.image_url)
 
-        # 2c. News images -> Priority #2
-        for n in observation.news:
+        # 2b. News images -> Priority #2 (most relevant articles first)
+        for n in news:
             if n.image_url:
                 image_urls.append(n.image_url)
 
+        # 2c. Trim to the token budget (newest/most relevant articles, then images)
+        budget_report = None
+        if self.token_budget:
+            news, image_urls, budget_report = self._apply_token_budget(observation, news, image_urls, market_rules, market_data_str)
+
         # 3. Format Portfolio
         positions_str = str(observation.portfolio.positions)
         
-        # 4. Construct Prompt
+        # 4. Construct Prompt (with a budget, its rendered size is checked too)
+        system_prompt = self._system_prompt(observation, market_rules)
+        if budget_report:
+            news, image_urls, rendered = self._fit_rendered_prompt(observation, system_prompt, news, image_urls, market_data_str, positions_str, budget_report)
+        else:
+            rendered = self._render_prompt(observation, news, market_data_str, positions_str)
+        user_prompt, stable_chars, replayed_days = rendered
+
+        try:
+            # 5. Call LLM
+            response_text = self.provider.generate(system_prompt, user_prompt, image_urls)
+            self.last_step_info = {
+                "prompt_layout": self.prompt_layout,
+                "prompt_chars": len(system_prompt) + len(user_prompt),
+                "stable_prefix_chars": len(system_prompt) + stable_chars,
+                "out_of_window_days": replayed_days,
+                "usage": getattr(self.provider, "last_usage", None),
+                "token_budget": budget_report.dict() if budget_report else None
+            }
+            
+            # 6. Parse JSON
+            return parse_action(response_text)
+            
+        except Exception as e:
+            logger.error(f"Failed to generate/parse action: {e}")
+            return fallback_action(e)
+
+    def _render_prompt(self, observation: Observation, news: list, market_data_str: str, positions_str: str):
+        """User prompt in the configured layout. Returns (prompt, stable prefix length, out-of-window days)."""
+        # Group news by Date for the 14-day timeline
+        news_by_date = {}
+        for n in news:
+            date_str = n.timestamp.strftime("%Y-%m-%d")
+            if date_str not in news_by_date:
+                news_by_date[date_str] = []
+            news_by_date[date_str].append(self._news_line(n))
+
+        if self.prompt_layout == "prefix_stable":
+            return self._prefix_stable_prompt(observation, news_by_date, market_data_str, positions_str)
+
+        # Format the grouped string
+        news_strs = []
+        for d in sorted(news_by_date.keys()):
+            news_strs.extend(self._day_block(d, news_by_date[d]))
+
+        news_str = "\n".join(news_strs) if news_strs else "No news available for the given timeframe."
         user_prompt = USER_PROMPT_TEMPLATE.format(
             date=observation.timestamp.strftime("%Y-%m-%d"),
             window_days=observation.context_window_days,
@@ -67,32 +161,182 @@ class SequentialLLMAgent(Agent):
             news_str=news_str,
             market_question=self.market_question
         )
+        return user_prompt, 0, 0
 
-        try:
-            # 5. Call LLM
-            system_prompt = get_system_prompt(self.market_question, market_rules).replace("{{window_days}}", str(observation.context_window_days))
-            response_text = self.provider.generate(system_prompt, user_prompt, image_urls)
-            
-            # 6. Parse JSON
-            # Basic cleanup to handle markdown fences if the model adds them
-            clean_text = response_text.replace("```json", "").replace("```", "").strip()
-            data = json.loads(clean_text)
-            
-            return Action(
-                action_type=TradeType(data["action"]),
-                market_id=data["market_id"],
-                quantity=int(data["quantity"]),
-                reasoning=data["reasoning"],
-                belief=float(data["belief_probability"])
-            )
-            
-        except Exception as e:
-            logger.error(f"Failed to generate/parse action: {e}")
-            # Fallback action
-            return Action(
-                action_type=TradeType.HOLD,
-                market_id="error_fallback",
-                quantity=0,
-                reasoning=f"Error in LLM processing: {str(e)}",
-                belief=0.5
-            )
+    def _fit_rendered_prompt(self, observation: Observation, system_prompt: str, news: list, image_urls: list, market_data_str: str, positions_str: str, report: BudgetReport):
+        """
+        Renders the prompt and checks its actual size (system prompt, user
+        text, images) against `token_budget`; the per-item estimate of
+        _apply_token_budget does not see layout text or the days replayed by
+        the prefix-stable layout. Until it fits, drops replayed days from
+        before the window (oldest first), then the lowest-priority article,
+        then the last image. Drops are added to `report`.
+        Returns (news, image_urls, (prompt, stable prefix length, out-of-window days)).
+        """
+        model = getattr(self.provider, "model_name", "gpt-4o")
+        detail = getattr(self.provider, "image_detail", "low")
+        charts = {snap.image_url for snap in observation.market_snapshots.values() if snap.image_url}
+        window_start = (observation.timestamp - timedelta(days=observation.context_window_days)).strftime("%Y-%m-%d")
+        by_priority = sorted(news, key=lambda n: n.timestamp.date(), reverse=True)
+        system_tokens = count_tokens(system_prompt, model)
+
+        while True:
+            rendered = self._render_prompt(observation, news, market_data_str, positions_str)
+            image_costs = [image_tokens(detail, image_size(url)) for url in image_urls]
+            report.used = system_tokens + count_tokens(rendered[0], model) + sum(image_costs)
+            if report.used <= self.token_budget:
+                break
+            replayed = sorted(d for d in self._frozen_days if d < window_start)
+            if replayed:
+                block = self._frozen_days.pop(replayed[0])[1]
+                report.dropped.append(BudgetItem(kind="replay", key=replayed[0], tokens=count_tokens(block, model)))
+            elif by_priority:
+                dropped = by_priority.pop()
+                news = [n for n in news if n is not dropped]
+                report.dropped.append(BudgetItem(kind="news", key=dropped.headline, tokens=count_tokens(self._news_line(dropped), model)))
+                report.kept["news"] = report.kept.get("news", 1) - 1
+                still_used = charts | {n.image_url for n in news if n.image_url}
+                image_urls = [url for url in image_urls if url in still_used]
+            elif image_urls:
+                report.dropped.append(BudgetItem(kind="image", key=image_urls[-1], tokens=image_costs[-1]))
+                report.kept["image"] = report.kept.get("image", 1) - 1
+                image_urls = image_urls[:-1]
+            else:
+                print(f"[Token Budget] rules and market data alone take {report.used}/{report.budget} tokens")
+                break
+        return news, image_urls, rendered
+
+    def _system_prompt(self, observation: Observation, market_rules: str) -> str:
+        return get_system_prompt(self.market_question, market_rules).replace("{{window_days}}", str(observation.context_window_days))
+
+    def _news_line(self, n) -> str:
+        sources = ", ".join(n.metadata.get("sources", [n.source]))  # Merged duplicates list every source
+        return f"[{sources}] {n.headline}: {n.content[:self.max_content]}"
+
+    def _apply_token_budget(self, observation: Observation, news: list, image_urls: list, market_rules: str, market_data_str: str):
+        """
+        Trims articles and images to `token_budget` input tokens. The system
+        prompt (rules) and the market data/portfolio are always sent; then
+        articles newest day first, by relevance within a day; then images in
+        their priority order (charts first), up to the provider's image cap.
+        Returns (news, image_urls, report), news in its original order.
+        """
+        budget = TokenBudget(
+            self.token_budget,
+            model=getattr(self.provider, "model_name", "gpt-4o"),
+            image_detail=getattr(self.provider, "image_detail", "low")
+        )
+        # The prompt without article lines, in the layout actually rendered
+        day_headers = "\n".join(sorted({f"--- news from {n.timestamp:%Y-%m-%d} ---" for n in news}))
+        fields = dict(
+            date=observation.timestamp.strftime("%Y-%m-%d"),
+            window_days=observation.context_window_days,
+            cash=observation.portfolio.cash,
+            positions=str(observation.portfolio.positions),
+            market_data_str=market_data_str,
+            market_question=self.market_question
+        )
+        if self.prompt_layout == "prefix_stable":
+            skeleton = PREFIX_STABLE_USER_TEMPLATE.format(older_news_str=day_headers, latest_news_str="", timeline_note=self._timeline_note(), **fields)
+        else:
+            skeleton = USER_PROMPT_TEMPLATE.format(news_str=day_headers, **fields)
+        # Stable sort: the relevance order survives within each day
+        by_priority = sorted(news, key=lambda n: n.timestamp.date(), reverse=True)
+        keep = budget.fill([
+            budget.text_item("rules", "system prompt", self._system_prompt(observation, market_rules), required=True),
+            budget.text_item("market", "market data and portfolio", skeleton, required=True),
+        ] + [budget.text_item("news", n.headline, self._news_line(n)) for n in by_priority])
+        kept_ids = {id(n) for n, k in zip(by_priority, keep[2:]) if k}
+        kept_news = [n for n in news if id(n) in kept_ids]
+
+        # Images of dropped articles go with them; the provider never sends more than max_images
+        allowed = {n.image_url for n in kept_news if n.image_url}
+        allowed.update(snap.image_url for snap in observation.market_snapshots.values() if snap.image_url)
+        candidates = list(dict.fromkeys(url for url in image_urls if url in allowed))
+        max_images = getattr(self.provider, "max_images", None)
+        if max_images is not None:
+            candidates = candidates[:max_images]
+        keep = budget.fill([budget.image_item(url) for url in candidates])
+        kept_images = [url for url, k in zip(candidates, keep) if k]
+
+        report = budget.report()
+        if report.dropped:
+            dropped_news = sum(1 for item in report.dropped if item.kind == "news")
+            dropped_images = sum(1 for item in report.dropped if item.kind == "image")
+            print(f"[Token Budget] {report.used}/{report.budget} tokens; dropped {dropped_news} article(s), {dropped_images} image(s)")
+        return kept_news, kept_images, report
+
+    @staticmethod
+    def _day_block(date_str: str, lines: list) -> list:
+        return [f"--- news from {date_str} ---", *lines, ""]
+
+    def _prefix_stable_prompt(self, observation: Observation, news_by_date: dict, market_data_str: str, positions_str: str):
+        """
+        User message ordered from most to least stable, so consecutive days
+        share a long exact prefix for provider-side prompt caching: the
+        run-level instruction, older timeline days oldest first, then the
+        newest day, date, portfolio and market data (images follow the text).
+
+        Older days are rendered once and replayed verbatim afterwards; a day
+        is re-rendered (one cache miss) only when its set of articles changes,
+        e.g. a late article arrives. The timeline starts at an anchor that
+        advances every `prefix_block_days` instead of daily, because dropping
+        the oldest day each step would change the prefix every step; days
+        between the anchor and the window start were shown in earlier steps
+        and replay from their frozen blocks. This widens the observation by
+        up to `prefix_block_days - 1` days, so it is opt-in (the default 0
+        keeps the exact window); the prompt says so, and the count is
+        returned and logged.
+        Returns (user prompt, length of the stable prefix, out-of-window days).
+        """
+        window_start = (observation.timestamp - timedelta(days=observation.context_window_days)).date()
+        if self._origin is None:
+            self._origin = window_start
+        anchor = window_start
+        if self.prefix_block_days > 0:
+            offset = (window_start - self._origin).days
+            anchor = self._origin + timedelta(days=offset - offset % self.prefix_block_days)
+        anchor_str = anchor.strftime("%Y-%m-%d")
+
+        dates = sorted(news_by_date)
+        newest = dates[-1] if dates else None
+        for d in dates[:-1]:
+            lines = frozenset(news_by_date[d])
+            # Relevance order may shift daily; only a changed article set re-freezes the day
+            if d not in self._frozen_days or self._frozen_days[d][0] != lines:
+                self._frozen_days[d] = (lines, "\n".join(self._day_block(d, news_by_date[d])))
+        window_start_str = window_start.strftime("%Y-%m-%d")
+        # In-window days come from today's news only (a day can be emptied by the token budget);
+        # frozen blocks are replayed just for the days before the window
+        self._frozen_days = {
+            d: frozen for d, frozen in self._frozen_days.items()
+            if d >= anchor_str and (d < window_start_str or d in news_by_date)
+        }
+
+        older_days = [d for d in sorted(self._frozen_days) if newest is None or d < newest]
+        older = [self._frozen_days[d][1] for d in older_days]
+        replayed_days = sum(1 for d in older_days if d < window_start_str)
+        if replayed_days:
+            print(f"DEBUG: Prefix-stable layout replays {replayed_days} day(s) before the {observation.context_window_days}-day window")
+        older_news_str = "\n".join(older) if older else "No earlier news."
+        latest_news_str = "\n".join(self._day_block(newest, news_by_date[newest])) if newest else "No news available for the given timeframe."
+
+        user_prompt = PREFIX_STABLE_USER_TEMPLATE.format(
+            date=observation.timestamp.strftime("%Y-%m-%d"),
+            window_days=observation.context_window_days,
+            cash=observation.portfolio.cash,
+            positions=positions_str,
+            market_data_str=market_data_str,
+            older_news_str=older_news_str,
+            latest_news_str=latest_news_str,
+            market_question=self.market_question,
+            timeline_note=self._timeline_note()
+        )
+        return user_prompt, user_prompt.index("[LATEST NEWS]"), replayed_days
+
+    def _timeline_note(self) -> str:
+        # Constant for the run, so it does not break the shared prefix
+        if self.prefix_block_days <= 1:
+            return ""
+        return (f"\nThe timeline may also keep up to {self.prefix_block_days - 1} earlier day(s) you have already seen;"
+                f" it restarts every {self.prefix_block_days} days.")
@@ -2,22 +2,81 @@ import os
 import base64
 import mimetypes
 import requests
-import io
-from typing import List, Optional
-from PIL import Image
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Tuple
 from openai import OpenAI
 from src.core.llm_interface import LLMProvider
+from src.utils.image_cache import ImageCache
+from src.utils.images import prepare_image
 
 class OpenAIProvider(LLMProvider):
-    def __init__(self, model_name: str = "gpt-4o", api_key: Optional[str] = None):
+    def __init__(
+        self,
+        model_name: str = "gpt-4o",
+        api_key: Optional[str] = None,
+        image_cache: Optional[ImageCache] = None,
+        max_images: int = 3,
+        image_deadline: float = 10.0,
+        image_workers: int = 6,
+        image_detail: str = "low",
+        image_format: str = "JPEG",
+        image_max_bytes: Optional[int] = None,
+        temperature: float = 0.0
+    ):
         # Use provided key or fallback to env var
         self.client = OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
         self.model_name = model_name
+        self.temperature = temperature
+        # Optional disk cache for remote news images (None = always download)
+        self.image_cache = image_cache
+        # Cap images per call to prevent LLM distraction/context fatigue
+        self.max_images = max_images
+        # Wall-clock budget (seconds) for preparing all images of one call
+        self.image_deadline = image_deadline
+        # Images are downscaled to the effective resolution of `image_detail`
+        # ("low" uses fewer tokens; "high" for detail) and recompressed to
+        # `image_format` within `image_max_bytes` before base64 encoding.
+        self.image_detail = image_detail
+        self.image_format = image_format
+        self.image_max_bytes = image_max_bytes
+        # Fetch + decode/resize/encode run here; Pillow releases the GIL for the heavy parts
+        self._image_pool = ThreadPoolExecutor(max_workers=image_workers, thread_name_prefix="image-fetch")
+        # Step budget, set per step by the environment (None = unbounded)
+        self.deadline = None
+        # Token usage of the last call, incl. prompt tokens served from the provider's prefix cache
+        self.last_usage = None
 
     def _encode_image(self, image_source: str) -> Optional[str]:
         """
         Downloads and encodes a local path or remote URL into a base64 data URL.
         Returns None if the image cannot be fetched or is not a valid image type.
+        Remote results (including failures) are served from the image cache when enabled.
+        Sources that are already data URLs (prepared earlier, e.g. by CachedLLMProvider) pass through.
+        """
+        if image_source.startswith("data:"):
+            return image_source
+        if os.path.exists(image_source) or not self.image_cache:
+            payload, _ = self._fetch_and_convert(image_source)
+            return payload
+
+        # Payloads depend on the preprocessing settings, so they are part of the key
+        variant = f"{self.image_detail}:{self.image_format}:{self.image_max_bytes}"
+        found, payload = self.image_cache.get(image_source, variant)
+        if found:
+            return payload
+
+        payload, error = self._fetch_and_convert(image_source)
+        if payload:
+            self.image_cache.put(image_source, payload, variant)
+        else:
+            self.image_cache.put_failure(image_source, error or "unknown", variant)
+        return payload
+
+    def _fetch_and_convert(self, image_source: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Fetches, converts and validates a single image.
+        Returns (data_url, None) on success or (None, failure_reason).
         """
         try:
             if os.path.exists(image_source):
@@ -34,79 +93,122 @@ class OpenAIProvider(LLMProvider):
                 mime_type = resp.headers.get('Content-Type', '').split(';')[0].strip()
                 data = resp.content
 
-            # OpenAI Vision only supports specific formats: png, jpeg, gif, webp
-            # See: https://platform.openai.com/docs/guides/vision/limitations
-            ALLOWED_TYPES = ['image/png', 'image/jpeg', 'image/gif', 'image/webp']
-            
-            # --- AVIF Conversion ---
-            if mime_type == 'image/avif':
-                try:
-                    print(f"[Image Conv] Converting AVIF to JPEG: {image_source[:60]}...")
-                    img = Image.open(io.BytesIO(data))
-                    # Convert to RGB to ensure JPEG compatibility (removes alpha if present)
-                    if img.mode in ("RGBA", "P"):
-                        img = img.convert("RGB")
-                    
-                    output = io.BytesIO()
-                    img.save(output, format="JPEG", quality=85)
-                    data = output.getvalue()
-                    mime_type = "image/jpeg"
-                except Exception as conv_err:
-                    print(f"[Image Skip] Failed to convert AVIF: {conv_err}")
-                    return None
-
-            if not mime_type or mime_type not in ALLOWED_TYPES:
-                if mime_type:
-                    print(f"[Image Skip] {image_source[:60]}... → Unsupported format: {mime_type}")
-                return None
+            # Skip non-image responses (HTML error pages, redirects to paywalls, ...)
+            if mime_type and not mime_type.startswith('image/'):
+                print(f"[Image Skip] {image_source[:60]}... → Unsupported format: {mime_type}")
+                return None, f"unsupported_type: {mime_type}"
 
             # Skip empty or tiny responses (likely error pages)
             if len(data) < 1000:
                 print(f"[Image Skip] {image_source[:60]}... → File too small ({len(data)} bytes)")
-                return None
+                return None, f"too_small: {len(data)} bytes"
+
+            # --- Downscale + Recompress ---
+            # Also normalises AVIF/TIFF/etc. into a format OpenAI Vision accepts
+            # (png, jpeg, gif, webp — see https://platform.openai.com/docs/guides/vision/limitations)
+            try:
+                data, mime_type = prepare_image(data, detail=self.image_detail, fmt=self.image_format, max_bytes=self.image_max_bytes)
+            except Exception as conv_err:
+                print(f"[Image Skip] {image_source[:60]}... → Unreadable image ({mime_type or 'unknown'}): {conv_err}")
+                return None, f"unsupported_type: {mime_type or 'unknown'}"
 
             encoded = base64.b64encode(data).decode('utf-8')
-            return f"data:{mime_type};base64,{encoded}"
+            return f"data:{mime_type};base64,{encoded}", None
         except Exception as e:
             print(f"[Image Skip] {image_source[:80]}... → {type(e).__name__}: {e}")
-            return None
+            return None, f"{type(e).__name__}: {e}"
 
-    def generate(self, system_prompt: str, user_prompt: str, image_urls: Optional[List[str]] = None) -> str:
-        messages = [
-            {"role": "system", "content": system_prompt}
-        ]
+    def _prepare_images(self, image_urls: List[str]) -> List[str]:
+        """
+        Fetches and encodes all candidate images concurrently, then keeps the
+        first `max_images` that succeed in priority order (charts come first).
+        Candidates still pending when `image_deadline` expires are skipped, so
+        preparation takes max-of rather than sum-of the individual fetches.
+        """
+        candidates = list(dict.fromkeys(url for url in image_urls if url))
+        if not candidates or self.max_images <= 0:
+            return []
+        # Prepared earlier (CachedLLMProvider keys on the payloads): nothing to fetch
+        if all(url.startswith("data:") for url in candidates):
+            return candidates[:self.max_images]
 
-        user_content = []
-        user_content.append({"type": "text", "text": user_prompt})
+        budget = self.image_deadline
+        budget_bound = bool(self.deadline and self.deadline.binds(budget))
+        if budget_bound:
+            budget = self.deadline.remaining(budget)
+        deadline = time.monotonic() + budget
+        futures = [self._image_pool.submit(self._encode_image, url) for url in candidates]
 
-        # Add images — download and base64-encode locally to avoid CDN blocks
-        # Cap at 3 images per call to prevent LLM distraction/context fatigue
-        if image_urls:
-            encoded_count = 0
-            for url in image_urls:
-                if not url or encoded_count >= 3:
-                    break
-                image_payload = self._encode_image(url)
-                if image_payload:
-                    user_content.append({
-                        "type": "image_url",
-                        "image_url": {
-                            "url": image_payload,
-                            "detail": "low"  # "low" uses fewer tokens; switch to "high" for detail
-                        }
-                    })
-                    encoded_count += 1
-            if encoded_count > 0:
-                print(f"[Vision] Sending {encoded_count} image(s) to OpenAI.")
-        
-        messages.append({"role": "user", "content": user_content})
+        payloads = []
+        skipped = 0
+        for url, future in zip(candidates, futures):
+            if len(payloads) >= self.max_images:
+                break
+            try:
+                payload = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                print(f"[Image Skip] {url[:60]}... → Deadline exceeded ({budget:.0f}s)")
+                skipped += 1
+                continue
+            if payload:
+                payloads.append(payload)
+
+        # Drop queued candidates we no longer need; in-flight ones finish in the background
+        for future in futures:
+            future.cancel()
+
+        if skipped and budget_bound:
+            self.deadline.degrade("images", f"{skipped} image(s) skipped, {len(payloads)} sent")
+
+        if payloads:
+            print(f"[Vision] Sending {len(payloads)} image(s) to OpenAI.")
+        return payloads
+
+    def generate(self, system_prompt: str, user_prompt: str, image_urls: Optional[List[str]] = None) -> str:
+        return self.generate_chat(system_prompt, [{"role": "user", "content": user_prompt}], image_urls)
+
+    def generate_chat(self, system_prompt: str, messages: List[Dict[str, str]], image_urls: Optional[List[str]] = None) -> str:
+        chat = self._build_messages(system_prompt, messages, image_urls)
 
         try:
             response = self.client.chat.completions.create(
                 model=self.model_name,
-                messages=messages,
-                temperature=0.0
+                messages=chat,
+                temperature=self.temperature
             )
+            self._record_usage(response)
             return response.choices[0].message.content
         except Exception as e:
             raise e
+
+    def _build_messages(self, system_prompt: str, messages: List[Dict[str, str]], image_urls: Optional[List[str]] = None) -> List[dict]:
+        """Chat Completions messages; images are attached to the last (current) user turn."""
+        chat = [
+            {"role": "system", "content": system_prompt}
+        ]
+        chat.extend({"role": m["role"], "content": m["content"]} for m in messages[:-1])
+
+        user_content = []
+        user_content.append({"type": "text", "text": messages[-1]["content"]})
+
+        # Add images — download and base64-encode locally to avoid CDN blocks
+        for image_payload in self._prepare_images(image_urls or []):
+            user_content.append({
+                "type": "image_url",
+                "image_url": {
+                    "url": image_payload,
+                    "detail": self.image_detail
+                }
+            })
+        
+        chat.append({"role": "user", "content": user_content})
+        return chat
+
+    def _record_usage(self, response):
+        usage = response.usage
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.last_usage = {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "cached_tokens": getattr(details, "cached_tokens", None) or 0
+        } if usage else None
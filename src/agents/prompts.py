@@ -48,3 +48,68 @@ Positions: {positions}
 Analyze the rolling timeline regarding="{market_question}" over the past {window_days} days.
 Update your belief. Decide your action.
 """
+
+# Prefix-stable layout: run-level text first, then older timeline days (replayed
+# verbatim between steps), then everything that changes daily. Consecutive days
+# then share a long exact prompt prefix that provider-side prompt caching can reuse.
+PREFIX_STABLE_USER_TEMPLATE = """
+[INSTRUCTION]
+Analyze the rolling timeline regarding="{market_question}" over the past {window_days} days.{timeline_note}
+Update your belief. Decide your action.
+
+[PAST NEWS TIMELINE]
+{older_news_str}
+
+[LATEST NEWS]
+{latest_news_str}
+
+--- CURRENT DATE: {date} ---
+
+[PORTFOLIO]
+Cash: ${cash:.2f}
+Positions: {positions}
+
+[MARKET DATA]
+{market_data_str}
+"""
+
+# Conversational agent: appended to the system prompt
+CONVERSATION_SYSTEM_SUFFIX = """
+This is a running conversation, one user turn per trading day.
+The first turn contains the full news timeline. Later turns contain only the news and
+price changes since your previous decision; earlier days are in the previous turns or,
+once the conversation grows long, in the [JOURNAL] that summarizes them.
+"""
+
+CONVERSATION_TURN_TEMPLATE = """
+--- CURRENT DATE: {date} ---
+
+[PORTFOLIO]
+Cash: ${cash:.2f}
+Positions: {positions}
+
+[MARKET DATA]
+{market_data_str}
+
+[{news_header}]
+{news_str}
+
+[INSTRUCTION]
+Update your belief regarding="{market_question}" with this information. Decide your action.
+"""
+
+JOURNAL_SYSTEM_PROMPT = """You maintain the trading journal of an agent trading the prediction market:
+"{market_question}"
+
+Merge the existing journal and the conversation excerpt into an updated journal of at most {max_words} words.
+Keep dated facts that bear on the resolution rules, how prices moved, and the agent's actions and beliefs over time.
+Drop repetition and anything irrelevant to the question. Reply with the journal text only.
+"""
+
+JOURNAL_USER_TEMPLATE = """
+[EXISTING JOURNAL]
+{journal}
+
+[CONVERSATION EXCERPT]
+{excerpt}
+"""
@@ -239,8 +239,7 @@ class QwenProvider(LLMProvider):
                 start_published_date=start_str,
                 end_published_date=end_str,
                 num_results=max_results,
-                text=True,
-                highlights=True,
+                text={"max_characters": max_content},
             )
 
             if not response.results:
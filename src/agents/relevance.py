@@ -0,0 +1,58 @@
+from collections import Counter
+from itertools import chain
+from typing import List, Tuple
+
+import numpy as np
+
+from src.core.types import NewsItem
+from src.utils.bm25 import score_matrix
+from src.utils.text import tokenize
+
+# Resolution rules are long and boilerplate-heavy; their terms count less than the question's
+RULES_WEIGHT = 0.3
+
+
+def rank_news(
+    news: List[NewsItem],
+    question: str,
+    rules: str = "",
+    min_relevance: float = 0.1,
+    min_keep: int = 3,
+) -> List[Tuple[NewsItem, float]]:
+    """
+    Scores articles with BM25 against the market question (and, at lower
+    weight, the resolution rules), with IDF taken over the articles
+    themselves. Scores are relative to the best article; items below
+    `min_relevance` are dropped unless fewer than `min_keep` would remain.
+    Returns (item, relative score) pairs in the input order.
+    """
+    if not news:
+        return []
+
+    question_terms = Counter(tokenize(question))
+    rules_terms = Counter(tokenize(rules)) if rules and rules != "None Provided" else Counter()
+    vocab = list(question_terms | rules_terms)
+    if not vocab:
+        return [(item, 1.0) for item in news]
+    column = {t: j for j, t in enumerate(vocab)}
+    query_weights = np.array([question_terms[t] + RULES_WEIGHT * rules_terms[t] for t in vocab])
+
+    # Term frequencies: all tokens mapped to vocabulary columns at once
+    # (-1 = not a query term), then counted over flattened (row, column) cells
+    docs = [tokenize(item.headline + " " + item.content) for item in news]
+    doc_lens = np.array([len(tokens) for tokens in docs], dtype=np.float64)
+    columns = np.fromiter((column.get(t, -1) for t in chain.from_iterable(docs)), dtype=np.int64, count=int(doc_lens.sum()))
+    rows = np.repeat(np.arange(len(news)), doc_lens.astype(np.int64))
+    hit = columns >= 0
+    cells = np.bincount(rows[hit] * len(vocab) + columns[hit], minlength=len(news) * len(vocab))
+    tf = cells.reshape(len(news), len(vocab)).astype(np.float64)
+
+    df = (tf > 0).sum(axis=0)
+    idf_weights = np.log(1.0 + (len(news) - df + 0.5) / (df + 0.5))
+    scores = score_matrix(tf, doc_lens, idf_weights, query_weights)
+    relative = scores / scores.max() if scores.max() > 0 else np.ones(len(news))
+
+    keep = relative >= min_relevance
+    if keep.sum() < min(min_keep, len(news)):
+        keep[np.argsort(-relative)[:min_keep]] = True
+    return [(item, float(r)) for item, r, k in zip(news, relative, keep) if k]
@@ -0,0 +1,128 @@
+import math
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+from pydantic import BaseModel
+
+from src.utils.images import effective_size
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Estimate when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+# Vision pricing: a fixed cost per image, plus one per 512px tile at high detail
+IMAGE_BASE_TOKENS = 85
+IMAGE_TILE_TOKENS = 170
+IMAGE_TILE_SIDE = 512
+
+# Assumed source size of images not yet fetched (16:9 landscape, the common news photo)
+DEFAULT_IMAGE_SIZE = (2048, 1152)
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # The BPE files are downloaded on first use; offline we fall back to the estimate
+        print(f"[Token Budget] tokenizer unavailable ({type(e).__name__}), estimating {CHARS_PER_TOKEN} chars/token")
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """Token count of `text` with the model's tokenizer (tiktoken), or a chars/4 estimate."""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def image_size(src: str) -> Optional[Tuple[int, int]]:
+    """Pixel size of a local image (header only); None for remote URLs or unreadable files."""
+    if not os.path.exists(src):
+        return None
+    try:
+        with Image.open(src) as img:
+            return img.size
+    except Exception:
+        return None
+
+
+def image_tokens(detail: str = "low", size: Optional[Tuple[int, int]] = None) -> int:
+    """Input tokens of one image at `detail`, from its size (DEFAULT_IMAGE_SIZE if unknown)."""
+    if detail != "high":
+        return IMAGE_BASE_TOKENS
+    width, height = effective_size(*(size or DEFAULT_IMAGE_SIZE), detail="high")
+    tiles = math.ceil(width / IMAGE_TILE_SIDE) * math.ceil(height / IMAGE_TILE_SIDE)
+    return IMAGE_BASE_TOKENS + IMAGE_TILE_TOKENS * tiles
+
+
+class BudgetItem(BaseModel):
+    kind: str  # "rules", "market", "news", "image", "replay" (a frozen out-of-window day)
+    key: str  # What the report shows: headline, image path/URL, ...
+    tokens: int
+    required: bool = False
+
+
+class BudgetReport(BaseModel):
+    budget: int
+    used: int
+    kept: Dict[str, int]
+    dropped: List[BudgetItem]
+
+
+class TokenBudget:
+    """
+    Fills a per-call token budget in priority order.
+
+    Callers pass items already sorted by priority, in one or more `fill`
+    calls (e.g. images only once the articles they belong to are known).
+    Required items (system prompt/rules, market data) are always kept; the
+    rest are taken while they fit. An item that does not fit is skipped, so
+    a shorter, lower-priority item can still use the remaining room.
+    """
+
+    def __init__(self, max_tokens: int, model: str = "gpt-4o", image_detail: str = "low"):
+        self.max_tokens = max_tokens
+        self.model = model
+        self.image_detail = image_detail
+        self.used = 0
+        self.kept: Dict[str, int] = {}
+        self.dropped: List[BudgetItem] = []
+
+    def text_item(self, kind: str, key: str, text: str, required: bool = False) -> BudgetItem:
+        return BudgetItem(kind=kind, key=key, tokens=count_tokens(text, self.model), required=required)
+
+    def image_item(self, src: str) -> BudgetItem:
+        return BudgetItem(kind="image", key=src, tokens=image_tokens(self.image_detail, image_size(src)))
+
+    def fill(self, items: List[BudgetItem]) -> List[bool]:
+        """Returns a keep-flag per item; required items are charged before the others."""
+        self.used += sum(item.tokens for item in items if item.required)
+        keep = []
+        for item in items:
+            fits = item.required or self.used + item.tokens <= self.max_tokens
+            if fits and not item.required:
+                self.used += item.tokens
+            if fits:
+                self.kept[item.kind] = self.kept.get(item.kind, 0) + 1
+            else:
+                self.dropped.append(item)
+            keep.append(fits)
+        return keep
+
+    def report(self) -> BudgetReport:
+        return BudgetReport(budget=self.max_tokens, used=self.used, kept=dict(self.kept), dropped=list(self.dropped))
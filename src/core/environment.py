@@ -2,11 +2,14 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import os
 import json
-from .types import Observation, Action, TradeType, MarketSnapshot, PortfolioState
+from .types import Observation, Action, TradeType, MarketSnapshot, PortfolioState, NewsItem
 from .portfolio import Portfolio
 from .agent import Agent
 from ..data_loaders.market import DataProvider
 from ..utils.logger import ExperimentLogger
+from ..utils.chart_store import ChartStore, DEFAULT_CHART_STORE
+from ..data_loaders.article_store import article_id
+from ..utils.deadline import Deadline
 
 class MarketEnvironment:
     def __init__(
@@ -20,7 +23,9 @@ class MarketEnvironment:
         step_size: timedelta = timedelta(days=1),
         market_ids: List[str] = None,
         context_window_days: int = 14,
-        run_dir: str = "runs/default"
+        run_dir: str = "runs/default",
+        chart_store_dir: str = DEFAULT_CHART_STORE,
+        step_budget: Optional[float] = None
     ):
         self.current_time = start_date
         self.end_date = end_date
@@ -32,18 +37,26 @@ class MarketEnvironment:
         self.step_size = step_size
         self.market_ids = market_ids or ["market_1"]
         self.context_window_days = context_window_days
+        # Wall-clock seconds per step; stages past the budget degrade to
+        # cached/partial results (recorded in the step log) instead of blocking
+        self.step_budget = step_budget
         
         self.history: List[Dict[str, Any]] = []
         self.run_dir = run_dir
         self.raw_data_dir = os.path.join(run_dir, "raw_data")
-        self.charts_dir = os.path.join(run_dir, "charts")
+        # Article bodies are written once per run; step logs and raw_data
+        # reference them by article ID
+        self.articles_path = os.path.join(run_dir, "articles.jsonl")
+        self._logged_articles = set()
+        # Charts are shared across runs and deduplicated by content hash;
+        # step logs reference them by `chart_hash`.
+        self.chart_store = ChartStore(chart_store_dir)
         
         os.makedirs(self.raw_data_dir, exist_ok=True)
-        os.makedirs(self.charts_dir, exist_ok=True)
         
-        # Propagate chart dir and window to provider
-        if hasattr(self.market_provider, 'charts_dir'):
-            self.market_provider.charts_dir = self.charts_dir
+        # Propagate chart store and window to provider
+        if hasattr(self.market_provider, 'chart_store'):
+            self.market_provider.chart_store = self.chart_store
         if hasattr(self.market_provider, 'lookback_days'):
             self.market_provider.lookback_days = self.context_window_days
 
@@ -54,6 +67,12 @@ class MarketEnvironment:
         if self.current_time >= self.end_date:
             return False # Simulation finished
 
+        # Budget for this step, shared by every stage that may block
+        deadline = Deadline(self.step_budget)
+        for component in (self.market_provider, self.context_provider, getattr(self.agent, "provider", None)):
+            if hasattr(component, 'deadline'):
+                component.deadline = deadline
+
         # 1. Morning State Capture
         snapshots = {}
         current_prices = {}
@@ -115,14 +134,20 @@ class MarketEnvironment:
         )
 
         # 6. Logging
+        news_ids = self._log_articles(news)
         log_entry = {
             "timestamp": self.current_time.isoformat(),
             "market_prices": current_prices,
+            "chart_hashes": {mid: snap.chart_hash for mid, snap in snapshots.items()},
             "execution_price": execution_price if action.action_type != TradeType.HOLD else None,
             "portfolio_value": self.portfolio.get_state(current_prices).total_value,
             "action": action.dict(),
+            "news_fetch": getattr(self.context_provider, "last_fetch_report", None),
+            "step_latency_s": round(deadline.elapsed(), 3),
+            "degradations": deadline.degradations,
+            "agent_info": getattr(self.agent, "last_step_info", None),
             "observation": {
-                "news": [n.dict() for n in news],
+                "news_ids": news_ids,
                 "portfolio": observation.portfolio.dict()
             },
             "ground_truth_verification": {
@@ -147,20 +172,21 @@ class MarketEnvironment:
                     "bid": snap.best_bid,
                     "ask": snap.best_ask,
                     "volume": snap.volume,
-                    "chart_image": snap.image_url
+                    "chart_image": snap.image_url,
+                    "chart_hash": snap.chart_hash
                 }
                 for mid, snap in snapshots.items()
             },
             "market_rules": market_rules,
+            # Full text is in articles.jsonl under the same ID
             "news": [
                 {
+                    "id": aid,
                     "date": n.timestamp.strftime("%Y-%m-%d"),
                     "source": n.source,
-                    "headline": n.headline,
-                    "content": n.content,
-                    "image_url": n.image_url
+                    "headline": n.headline
                 }
-                for n in news
+                for aid, n in zip(news_ids, news)
             ],
             "agent_action": {
                 "action": action.action_type,
@@ -176,6 +202,19 @@ class MarketEnvironment:
         self.current_time += self.step_size
         return True
 
+    def _log_articles(self, news: List[NewsItem]) -> List[str]:
+        """Appends articles not yet written by this run to articles.jsonl; returns the IDs of `news`."""
+        ids = []
+        with open(self.articles_path, "a") as f:
+            for n in news:
+                # Versions differ in date/text; each one the agent saw is logged
+                aid = n.metadata.get("version_id") or article_id(n)
+                ids.append(aid)
+                if aid not in self._logged_articles:
+                    self._logged_articles.add(aid)
+                    f.write(json.dumps(dict(n.dict(), id=aid, timestamp=n.timestamp.isoformat()), default=str) + "\n")
+        return ids
+
     def run(self):
         """
         Runs the simulation until the end date.
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class LLMProvider(ABC):
     @abstractmethod
@@ -16,3 +16,23 @@ class LLMProvider(ABC):
             The raw text response.
         """
         pass
+
+    def generate_chat(self, system_prompt: str, messages: List[Dict[str, str]], image_urls: Optional[List[str]] = None) -> str:
+        """
+        Generates a reply to a multi-turn conversation.
+
+        Args:
+            system_prompt: High-level instructions (Role, Output format).
+            messages: Prior turns and the current one, as {"role": "user"|"assistant", "content": str},
+                ending with the current user turn.
+            image_urls: Images attached to the current (last) turn.
+
+        Returns:
+            The raw text response.
+
+        Providers without native chat support get the conversation flattened
+        into a single user prompt.
+        """
+        turns = [f"[{m['role'].upper()}]\n{m['content']}" for m in messages[:-1]]
+        user_prompt = "\n\n".join(turns + [messages[-1]["content"]])
+        return self.generate(system_prompt, user_prompt, image_urls)
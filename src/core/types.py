@@ -27,6 +27,7 @@ class MarketSnapshot(BaseModel):
     volume: int
     open_interest: int
     image_url: Optional[str] = None # For generated/fetched charts
+    chart_hash: Optional[str] = None # Content hash of the chart in the ChartStore
     chart_data: Optional[Dict[str, Any]] = None # Could be OHLCV series
     order_book: Optional[Dict[str, Any]] = None # Deep order book if available
 
@@ -37,6 +38,7 @@ class NewsItem(BaseModel):
     headline: str
     content: str
     image_url: Optional[str] = None
+    url: Optional[str] = None # Source article URL (used for the article ID)
     metadata: Dict[str, Any] = {}
 
 class Observation(BaseModel):
@@ -0,0 +1,120 @@
+import bisect
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from ..core.types import NewsItem
+from ..utils.storage import sha256_hex
+
+# Query parameters that only track the referrer and never change the article
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "ref", "cmpid", "ocid")
+
+
+def canonical_url(url: str) -> str:
+    """Lower-cased host without www., no fragment, no tracking parameters, no trailing slash."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [(k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith(_TRACKING_PARAMS)]
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme, host, parts.path.rstrip("/"), urlencode(sorted(query)), ""))
+
+
+def article_id(item: NewsItem) -> str:
+    """Stable ID: hash of the canonical URL, or of headline + content when there is no URL."""
+    if item.url:
+        key = "url:" + canonical_url(item.url)
+    else:
+        key = "text:" + item.headline.strip().lower() + "\n" + item.content.strip()
+    return sha256_hex(key.encode("utf-8"))[:16]
+
+
+def version_id(item: NewsItem, aid: str) -> str:
+    """ID of this exact copy of the article: same URL with another date or text is another version."""
+    key = item.timestamp.isoformat() + "\n" + item.headline + "\n" + item.content
+    return aid + "-" + sha256_hex(key.encode("utf-8"))[:8]
+
+
+def _naive(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=None)
+
+
+class ArticleStore:
+    """
+    Process-wide store of articles keyed by version (`article_id` plus a
+    hash of timestamp and text), with a publication-date index kept sorted
+    for range queries.
+
+    The same copy of a story retrieved on many steps, by many markets or by
+    several sources is interned to a single NewsItem; logs reference it by
+    version ID. Copies of one URL that differ (a source re-dating or
+    updating the article) are kept apart, so interning never hands a caller
+    a different date or text than the one it checked against its cutoff.
+    """
+
+    def __init__(self, max_articles: int = 200_000):
+        self.max_articles = max_articles
+        self._items: Dict[str, NewsItem] = {}
+        self._by_date: List[Tuple[datetime, str]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def intern(self, item: NewsItem) -> NewsItem:
+        """
+        Returns the stored copy of `item` (storing it first if new). It has
+        the same timestamp and text as `item`; metadata carries 'article_id'
+        and 'version_id'.
+        """
+        aid = item.metadata.get("article_id") or article_id(item)
+        vid = version_id(item, aid)
+        with self._lock:
+            stored = self._items.get(vid)
+            if stored is None:
+                stored = item.copy(update={"metadata": dict(item.metadata, article_id=aid, version_id=vid)})
+                self._items[vid] = stored
+                bisect.insort(self._by_date, (_naive(stored.timestamp), vid))
+                if len(self._items) > self.max_articles:
+                    self._evict_oldest(len(self._items) - self.max_articles)
+            else:
+                # Same copy seen through another source: remember where it came from
+                sources = stored.metadata.get("sources", [stored.source])
+                for src in item.metadata.get("sources", [item.source]):
+                    if src not in sources:
+                        stored.metadata["sources"] = sources = sources + [src]
+                if not stored.image_url and item.image_url:
+                    stored.image_url = item.image_url
+            return stored
+
+    def _evict_oldest(self, n: int):
+        for _, aid in self._by_date[:n]:
+            self._items.pop(aid, None)
+        del self._by_date[:n]
+
+    def get(self, vid: str) -> Optional[NewsItem]:
+        return self._items.get(vid)
+
+    def get_many(self, ids: List[str]) -> List[NewsItem]:
+        return [self._items[vid] for vid in ids if vid in self._items]
+
+    def range(self, start: datetime, end: datetime) -> List[str]:
+        """Version IDs of the articles published in [start, end), oldest first."""
+        with self._lock:
+            lo = bisect.bisect_left(self._by_date, (_naive(start), ""))
+            hi = bisect.bisect_left(self._by_date, (_naive(end), ""))
+            return [aid for _, aid in self._by_date[lo:hi]]
+
+
+_default_store: Optional[ArticleStore] = None
+_default_lock = threading.Lock()
+
+
+def get_article_store() -> ArticleStore:
+    """The process-wide ArticleStore shared by all context providers."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ArticleStore()
+        return _default_store
@@ -0,0 +1,88 @@
+from typing import List
+
+from ..core.types import NewsItem
+from ..utils.text import tokenize, shingles
+
+# Items with fewer content shingles than this only dedupe on exact headline match
+MIN_SHINGLES = 8
+
+
+def dedupe_news(
+    items: List[NewsItem],
+    keep: str = "earliest",
+    min_jaccard: float = 0.5,
+    min_containment: float = 0.8,
+) -> List[NewsItem]:
+    """
+    Collapses near-duplicate articles into one item: the same story from
+    Exa and Tavily (a Tavily snippet is usually contained in Exa's text) and
+    syndicated copies under different headlines. Pairs are compared on their
+    exact word 3-gram shingle sets (Jaccard, or containment |A ∩ B| /
+    min(|A|, |B|) for a snippet of a longer text).
+
+    keep="earliest" keeps the first-published copy, keep="longest" the most
+    complete one. Items whose date is only the search window start
+    (metadata["date_estimated"], Tavily results without a publication
+    date) never win on their date, so a snippet cannot displace the full
+    article it came from. The survivor lists every source in metadata["sources"] and
+    inherits an image from a duplicate if it has none.
+    """
+    if len(items) < 2:
+        return list(items)
+
+    grams = [set(shingles(tokenize(item.content))) for item in items]
+    comparable = [len(g) >= MIN_SHINGLES for g in grams]
+    headlines = [" ".join(tokenize(item.headline, remove_stopwords=False)) for item in items]
+
+    def near(i: int, j: int) -> bool:
+        if not (comparable[i] and comparable[j]):
+            return False
+        common = len(grams[i] & grams[j])
+        return (
+            common / len(grams[i] | grams[j]) >= min_jaccard
+            or common / min(len(grams[i]), len(grams[j])) >= min_containment
+        )
+
+    # Union-find over near-duplicate pairs; items too short to compare
+    # (e.g. "No Content") fall back to exact headline matches
+    parent = list(range(len(items)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(len(items)):
+        for j in range(i + 1, len(items)):
+            same_headline = bool(headlines[i]) and headlines[i] == headlines[j]
+            if near(i, j) or (same_headline and not (comparable[i] and comparable[j])):
+                parent[find(j)] = find(i)
+
+    clusters = {}
+    for i in range(len(items)):
+        clusters.setdefault(find(i), []).append(i)
+
+    def rank(i: int):
+        ts = items[i].timestamp.replace(tzinfo=None)
+        estimated = bool(items[i].metadata.get("date_estimated"))
+        if keep == "longest":
+            return (-len(items[i].content), estimated, ts)
+        return (estimated, ts, -len(items[i].content))
+
+    result = []
+    for root in sorted(clusters, key=lambda r: min(clusters[r])):  # Preserve original order
+        members = clusters[root]
+        best = min(members, key=rank)
+        item = items[best]
+        if len(members) > 1:
+            sources = []
+            for m in members:
+                for src in items[m].metadata.get("sources", [items[m].source]):
+                    if src not in sources:
+                        sources.append(src)
+            image_url = item.image_url or next((items[m].image_url for m in members if items[m].image_url), None)
+            metadata = dict(item.metadata, sources=sources, duplicates=len(members) - 1)
+            item = item.copy(update={"image_url": image_url, "metadata": metadata})
+        result.append(item)
+    return result
@@ -0,0 +1,105 @@
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from ..utils.text import tokenize
+
+# Thresholds/strikes/dates in slugs and questions: "160", "$1,200.50", "2.5%", "100k"
+_NUMBER_RE = re.compile(r"\$?\d[\d,]*(?:\.\d+)?[kmb%]?", re.IGNORECASE)
+# Years name different events ("...-winner-2024" vs "-2028"), so they are kept
+_YEAR_RE = re.compile(r"(?:19|20)\d{2}")
+
+
+def _is_threshold(token: str) -> bool:
+    return bool(_NUMBER_RE.fullmatch(token)) and not _YEAR_RE.fullmatch(token)
+
+
+def _strip_thresholds(text: str, repl: str) -> str:
+    return _NUMBER_RE.sub(lambda m: m.group(0) if _YEAR_RE.fullmatch(m.group(0)) else repl, text)
+
+
+def slug_template(slug: str) -> str:
+    """'nvda-above-160-on-jan-5' -> 'nvda-above-#-on-jan-#' (years stay: 'winner-2024')"""
+    return "-".join("#" if _is_threshold(part) else part for part in slug.lower().split("-"))
+
+
+def question_template(question: str) -> str:
+    """Question with numeric thresholds (not years) removed, used as the family's shared search query."""
+    return re.sub(r"\s+", " ", _strip_thresholds(question, "")).replace(" ?", "?").strip()
+
+
+def _question_terms(question: str) -> frozenset:
+    return frozenset(tokenize(_strip_thresholds(question, " ")))
+
+
+def _years(text: str) -> frozenset:
+    return frozenset(m.group(0) for m in _NUMBER_RE.finditer(text) if _YEAR_RE.fullmatch(m.group(0)))
+
+
+class EventFamily(BaseModel):
+    key: str       # Slug template, e.g. "nvda-above-#-on-jan-#"
+    ticker: str    # Slug without the numeric parts, used in search queries
+    question: str  # Question template shared by all members
+
+
+class EventFamilyRegistry:
+    """
+    Groups sibling markets (same event, different thresholds) so the context
+    layer can run one retrieval per family and window instead of one per
+    market.
+
+    Markets are candidates for a family when their slugs match after
+    templating out thresholds ('nvda-above-160' / 'nvda-above-170'; years
+    are kept), or else by question alone. Either way they join only when
+    their questions, stripped of thresholds, have a word Jaccard
+    similarity of at least `min_similarity` with the family's first member
+    and mention the same years.
+    """
+
+    def __init__(self, min_similarity: float = 0.7):
+        self.min_similarity = min_similarity
+        self._families: Dict[str, EventFamily] = {}
+        self._terms: Dict[str, Tuple[frozenset, frozenset]] = {}  # family key -> (question terms, years)
+        self._members: Dict[str, str] = {}  # market id -> family key
+        self._lock = threading.Lock()
+
+    def register(self, market_id: str, question: str) -> EventFamily:
+        with self._lock:
+            if market_id in self._members:
+                return self._families[self._members[market_id]]
+
+            key = slug_template(market_id)
+            terms = (_question_terms(question), _years(question))
+            if key not in self._families or self._similarity(terms, self._terms[key]) < self.min_similarity:
+                best, best_sim = None, 0.0
+                for other_key, other_terms in self._terms.items():
+                    sim = self._similarity(terms, other_terms)
+                    if sim > best_sim:
+                        best, best_sim = other_key, sim
+                if best is not None and best_sim >= self.min_similarity:
+                    key = best
+                else:
+                    ticker = "-".join(p for p in key.split("-") if p != "#")
+                    # Same slug template, different question: a family of its own
+                    base, n = key, 2
+                    while key in self._families:
+                        key, n = f"{base}~{n}", n + 1
+                    self._families[key] = EventFamily(key=key, ticker=ticker, question=question_template(question))
+                    self._terms[key] = terms
+
+            self._members[market_id] = key
+            return self._families[key]
+
+    @staticmethod
+    def _similarity(a: Tuple[frozenset, frozenset], b: Tuple[frozenset, frozenset]) -> float:
+        (a_terms, a_years), (b_terms, b_years) = a, b
+        if a_years != b_years:
+            return 0.0
+        union = a_terms | b_terms
+        return len(a_terms & b_terms) / len(union) if union else 0.0
+
+    def family_of(self, market_id: str) -> Optional[EventFamily]:
+        key = self._members.get(market_id)
+        return self._families.get(key) if key else None
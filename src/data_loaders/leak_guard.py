@@ -0,0 +1,125 @@
+"""
+Temporal leak guard.
+
+Leak rules live in JSON "pattern packs" (one per event family, see
+`leak_patterns/`). Each rule is active for simulation cutoffs in
+[active_from, active_before) and lists literal phrases that betray
+hindsight. All phrases of the currently active rules are compiled once into
+a single trie-shaped regex, so scanning an article costs one pass regardless
+of how many patterns are loaded.
+
+Pack format:
+    {
+      "event": "us-election-2024",
+      "rules": [
+        {"name": "election_outcome", "active_from": "2024-01-01", "active_before": "2024-11-01",
+         "patterns": ["trump wins", "president-elect"],
+         "requires_any": []}   # optional: content must also contain one of these
+      ]
+    }
+"""
+
+import os
+import re
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from pydantic import BaseModel
+
+DEFAULT_PATTERN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "leak_patterns")
+
+
+class LeakRule(BaseModel):
+    name: str
+    event: str = "general"
+    patterns: List[str]
+    active_from: Optional[datetime] = None
+    active_before: Optional[datetime] = None
+    requires_any: List[str] = []
+
+    def is_active(self, cutoff: datetime) -> bool:
+        cutoff = cutoff.replace(tzinfo=None)
+        if self.active_from and cutoff < self.active_from:
+            return False
+        if self.active_before and cutoff >= self.active_before:
+            return False
+        return True
+
+
+class LeakMatch(BaseModel):
+    rule: str
+    event: str
+    phrase: str
+
+
+def trie_regex(phrases: Iterable[str]) -> str:
+    """
+    Builds a regex matching any of `phrases` with shared prefixes factored
+    out, so the engine walks a trie instead of trying each alternative.
+    """
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        terminal = "" in node
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 and not terminal else "(?:" + "|".join(branches) + ")"
+        return body + "?" if terminal else body
+
+    return build(trie)
+
+
+class LeakGuard:
+    def __init__(self, rules: List[LeakRule]):
+        self.rules = rules
+        self._compiled: Dict[Tuple[int, ...], Tuple[Optional[re.Pattern], Dict[str, List[LeakRule]]]] = {}
+
+    @classmethod
+    def from_paths(cls, paths: Optional[List[str]] = None, include_default: bool = True) -> "LeakGuard":
+        """Loads the bundled packs (unless `include_default` is False) plus every pack in the given files/directories."""
+        files = []
+        for path in ([DEFAULT_PATTERN_DIR] if include_default else []) + list(paths or []):
+            found = [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith(".json")] if os.path.isdir(path) else [path]
+            files += [f for f in found if os.path.abspath(f) not in map(os.path.abspath, files)]
+
+        rules = []
+        for file in files:
+            with open(file) as f:
+                pack = json.load(f)
+            event = pack.get("event", os.path.splitext(os.path.basename(file))[0])
+            for rule in pack.get("rules", []):
+                rules.append(LeakRule(event=event, **rule))
+        return cls(rules)
+
+    def _matcher(self, cutoff: datetime):
+        """Compiled matcher for the rules active at `cutoff` (cached per active set)."""
+        active = tuple(i for i, rule in enumerate(self.rules) if rule.is_active(cutoff))
+        if active not in self._compiled:
+            by_phrase: Dict[str, List[LeakRule]] = {}
+            for i in active:
+                for phrase in self.rules[i].patterns:
+                    by_phrase.setdefault(phrase.lower(), []).append(self.rules[i])
+            pattern = re.compile(trie_regex(by_phrase)) if by_phrase else None
+            self._compiled[active] = (pattern, by_phrase)
+        return self._compiled[active]
+
+    def check(self, headline: str, content: str, cutoff: datetime) -> Optional[LeakMatch]:
+        """Returns the first rule that fires for an article, or None if clean."""
+        pattern, by_phrase = self._matcher(cutoff)
+        if pattern is None:
+            return None
+
+        content_lower = content.lower()
+        text = headline.lower() + "\n" + content_lower
+        for m in pattern.finditer(text):
+            for rule in by_phrase.get(m.group(0), []):
+                if rule.requires_any and not any(r in content_lower for r in rule.requires_any):
+                    continue
+                return LeakMatch(rule=rule.name, event=rule.event, phrase=m.group(0))
+        return None
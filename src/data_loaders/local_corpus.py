@@ -0,0 +1,238 @@
+"""
+Offline news source backed by a local article corpus.
+
+`build_index` turns JSONL (or Parquet, if pyarrow is installed) article dumps
+into an on-disk BM25 index partitioned by publication day:
+
+    <index_dir>/index.json              manifest: day -> doc count / total length
+    <index_dir>/shards/YYYY-MM-DD.json  docs, doc lengths and postings of that day
+
+A query for [start, end) only opens the shards of the days in the window and
+drops documents outside the exact bounds before scoring; IDF and average
+document length are computed over the in-window documents only, so nothing
+published after the cutoff can influence retrieval.
+
+Build/extend an index:
+    python -m src.data_loaders.local_corpus articles.jsonl more/ --index-dir cache/corpus_index
+"""
+
+import os
+import json
+import bisect
+import argparse
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..utils.bm25 import score_documents
+from ..utils.storage import atomic_write_json, read_json
+from ..utils.text import tokenize
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+DEFAULT_CORPUS_INDEX = os.path.join("cache", "corpus_index")
+
+# Field aliases accepted in corpus records (first present wins)
+_FIELDS = {
+    "timestamp": ("timestamp", "published_date", "published_at", "date"),
+    "headline": ("headline", "title"),
+    "content": ("content", "text", "body"),
+    "source": ("source", "domain", "publisher"),
+    "url": ("url", "link"),
+    "image_url": ("image_url", "image"),
+}
+
+
+def _field(record: Dict[str, Any], name: str) -> Any:
+    for alias in _FIELDS[name]:
+        if record.get(alias) not in (None, ""):
+            return record[alias]
+    return None
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    # Offsets are converted, not dropped: 22:00-05:00 belongs to the next UTC day
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """Naive (UTC) datetime from an ISO string/datetime, or None if unparseable."""
+    if isinstance(value, datetime):
+        return _to_naive_utc(value)
+    if not value:
+        return None
+    try:
+        return _to_naive_utc(datetime.fromisoformat(str(value).replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yields raw article records from a .jsonl/.json/.parquet file or a directory of them."""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            yield from iter_records(os.path.join(path, name))
+        return
+    if path.endswith(".parquet"):
+        if pq is None:
+            raise ImportError(f"pyarrow is required to read {path} (pip install pyarrow)")
+        yield from pq.read_table(path).to_pylist()
+    elif path.endswith(".jsonl"):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.endswith(".json"):
+        with open(path) as f:
+            data = json.load(f)
+        yield from (data if isinstance(data, list) else [data])
+
+
+def normalize_record(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    ts = _parse_timestamp(_field(record, "timestamp"))
+    content = _field(record, "content")
+    if ts is None or not content:
+        return None
+    return {
+        "timestamp": ts.isoformat(),
+        "source": str(_field(record, "source") or "Local"),
+        "headline": str(_field(record, "headline") or "No Title"),
+        "content": str(content),
+        "url": _field(record, "url"),
+        "image_url": _field(record, "image_url"),
+    }
+
+
+def _index_shard(docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    lens, postings = [], {}
+    for i, doc in enumerate(docs):
+        tokens = tokenize(doc["headline"] + " " + doc["content"])
+        lens.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            postings.setdefault(term, []).append([i, tf])
+    return {"docs": docs, "lens": lens, "postings": postings}
+
+
+def build_index(inputs: List[str], index_dir: str = DEFAULT_CORPUS_INDEX) -> Dict[str, int]:
+    """
+    Adds the articles in `inputs` to the index at `index_dir` (creating it if
+    needed). Articles already present (same timestamp + headline) are skipped.
+    Returns the number of documents per touched day.
+    """
+    by_day: Dict[str, List[Dict[str, Any]]] = {}
+    skipped = 0
+    for path in inputs:
+        for record in iter_records(path):
+            doc = normalize_record(record)
+            if doc is None:
+                skipped += 1
+                continue
+            by_day.setdefault(doc["timestamp"][:10], []).append(doc)
+
+    manifest = read_json(os.path.join(index_dir, "index.json")) or {"days": {}}
+    touched = {}
+    for day, new_docs in sorted(by_day.items()):
+        shard_path = os.path.join(index_dir, "shards", f"{day}.json")
+        docs = (read_json(shard_path) or {}).get("docs", [])
+        seen = {(d["timestamp"], d["headline"]) for d in docs}
+        for doc in new_docs:
+            if (doc["timestamp"], doc["headline"]) not in seen:
+                seen.add((doc["timestamp"], doc["headline"]))
+                docs.append(doc)
+        docs.sort(key=lambda d: d["timestamp"])
+        shard = _index_shard(docs)
+        atomic_write_json(shard_path, shard)
+        manifest["days"][day] = {"n_docs": len(docs), "total_len": sum(shard["lens"])}
+        touched[day] = len(docs)
+
+    manifest["built_at"] = datetime.now().isoformat()
+    atomic_write_json(os.path.join(index_dir, "index.json"), manifest)
+    if skipped:
+        print(f"Skipped {skipped} record(s) without a parseable timestamp or content")
+    return touched
+
+
+class LocalCorpusIndex:
+    """Read side of the day-partitioned BM25 index."""
+
+    def __init__(self, index_dir: str = DEFAULT_CORPUS_INDEX, max_cached_shards: int = 64):
+        self.index_dir = index_dir
+        self.max_cached_shards = max_cached_shards
+        self._shards: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        manifest = read_json(os.path.join(index_dir, "index.json")) or {"days": {}}
+        self.days = sorted(manifest["days"])
+
+    def _shard(self, day: str) -> Dict[str, Any]:
+        with self._lock:
+            if day in self._shards:
+                self._shards.move_to_end(day)
+                return self._shards[day]
+        shard = read_json(os.path.join(self.index_dir, "shards", f"{day}.json")) or {"docs": [], "lens": [], "postings": {}}
+        shard["ts"] = [datetime.fromisoformat(d["timestamp"]) for d in shard["docs"]]
+        with self._lock:
+            self._shards[day] = shard
+            while len(self._shards) > self.max_cached_shards:
+                self._shards.popitem(last=False)
+        return shard
+
+    def search(self, query: str, start: datetime, end: datetime, k: int = 7) -> List[Dict[str, Any]]:
+        """Top-k documents published in [start, end), ranked by BM25."""
+        start, end = start.replace(tzinfo=None), end.replace(tzinfo=None)
+        query_tokens = tokenize(query)
+        if not query_tokens or end <= start:
+            return []
+
+        # Partition pruning: only days overlapping the window are opened
+        lo = bisect.bisect_left(self.days, start.date().isoformat())
+        hi = bisect.bisect_right(self.days, (end - timedelta(microseconds=1)).date().isoformat())
+
+        n_docs, total_len, df = 0, 0, Counter()
+        candidates = []  # (shard, doc index, term freqs)
+        for day in self.days[lo:hi]:
+            shard = self._shard(day)
+            in_window = [start <= ts < end for ts in shard["ts"]]
+            n_docs += sum(in_window)
+            total_len += sum(l for l, ok in zip(shard["lens"], in_window) if ok)
+            tfs: Dict[int, Dict[str, int]] = {}
+            for term in set(query_tokens):
+                for i, tf in shard["postings"].get(term, []):
+                    if in_window[i]:
+                        df[term] += 1
+                        tfs.setdefault(i, {})[term] = tf
+            candidates.extend((shard, i, tf) for i, tf in tfs.items())
+
+        if not candidates:
+            return []
+        scores = score_documents(
+            query_tokens,
+            [tf for _, _, tf in candidates],
+            [shard["lens"][i] for shard, i, _ in candidates],
+            df, n_docs, total_len / max(1, n_docs),
+        )
+        ranked = sorted(zip(scores, range(len(candidates))), key=lambda x: -x[0])[:k]
+        results = []
+        for score, c in ranked:
+            shard, i, _ = candidates[c]
+            results.append(dict(shard["docs"][i], score=round(score, 4)))
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or extend the local news corpus index.")
+    parser.add_argument("inputs", nargs="+", help="JSONL/JSON/Parquet files or directories of articles")
+    parser.add_argument("--index-dir", type=str, default=DEFAULT_CORPUS_INDEX, help="Index location")
+    args = parser.parse_args()
+
+    touched = build_index(args.inputs, args.index_dir)
+    print(f"Indexed {sum(touched.values())} document(s) across {len(touched)} day(s) into {args.index_dir}")
+
+
+if __name__ == "__main__":
+    main()
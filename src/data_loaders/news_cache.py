@@ -0,0 +1,113 @@
+import os
+import re
+import json
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from ..core.types import NewsItem
+from ..utils.storage import atomic_write_json, read_json, file_lock, sha256_hex
+
+DEFAULT_NEWS_CACHE = os.path.join("cache", "news")
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+
+class NewsCache:
+    """
+    Persistent cache of raw search results keyed by
+    (source, normalized query, window start, window end, max_content).
+
+    Entries are stored *before* the temporal guard runs, so changing the leak
+    filters never invalidates cached data. Writes are atomic and misses are
+    single-flighted through a per-key file lock, so parallel processes running
+    the same market share one API call instead of racing.
+    """
+
+    def __init__(self, root: str = DEFAULT_NEWS_CACHE):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, source: str, query: str, start: datetime, end: datetime, max_content: int) -> str:
+        raw = json.dumps([
+            source,
+            normalize_query(query),
+            start.replace(tzinfo=None).isoformat(),
+            end.replace(tzinfo=None).isoformat(),
+            max_content,
+        ])
+        return sha256_hex(raw.encode("utf-8"))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def _lock_path(self, key: str) -> str:
+        # Striped locks: bounded number of lock files, rare contention
+        return os.path.join(self.root, ".locks", f"{key[:3]}.lock")
+
+    def get(self, key: str) -> Optional[List[NewsItem]]:
+        entry = read_json(self._path(key))
+        if entry is None:
+            return None
+        return [NewsItem(**item) for item in entry.get("items", [])]
+
+    def put(self, key: str, items: List[NewsItem], meta: Optional[Dict] = None):
+        atomic_write_json(self._path(key), {
+            "meta": meta or {},
+            "cached_at": datetime.now().isoformat(),
+            "items": [item.dict() for item in items],
+        })
+
+    def get_or_fetch(
+        self,
+        source: str,
+        query: str,
+        start: datetime,
+        end: datetime,
+        max_content: int,
+        fetch: Callable[[], List[NewsItem]],
+    ) -> List[NewsItem]:
+        """
+        Returns cached results or calls `fetch()` and stores them. Exceptions
+        from `fetch` propagate and nothing is cached, so transient API errors
+        are retried next time.
+        """
+        key = self.key(source, query, start, end, max_content)
+        items = self.get(key)
+        if items is None:
+            with file_lock(self._lock_path(key)):
+                # Another process may have filled the entry while we waited
+                items = self.get(key)
+                if items is None:
+                    self._count(hit=False)
+                    items = fetch()
+                    self.put(key, items, meta={
+                        "source": source,
+                        "query": query,
+                        "start": start.isoformat(),
+                        "end": end.isoformat(),
+                        "max_content": max_content,
+                    })
+                    return items
+        self._count(hit=True)
+        return items
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
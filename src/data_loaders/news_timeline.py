@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
+
+from ..core.types import NewsItem
+from .article_store import ArticleStore, get_article_store
+
+
+def _naive(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=None)
+
+
+class NewsTimeline:
+    """
+    Articles retrieved for one (market, source, query), plus the interval
+    [covered_start, covered_end) that has already been searched.
+
+    With daily steps, each new window overlaps the previous one except for
+    its newest day, so only that gap needs to be fetched and merged in.
+
+    Articles live in the shared ArticleStore; the timeline only holds the
+    version IDs of the copies it fetched and answers windows with a range
+    query on the store's date index. Results are raw source output: the
+    provider's guard and dedup run on them afterwards.
+    """
+
+    def __init__(self, store: Optional[ArticleStore] = None):
+        self.store = store if store is not None else get_article_store()
+        self.covered_start: Optional[datetime] = None
+        self.covered_end: Optional[datetime] = None
+        self._ids: Set[str] = set()
+
+    @property
+    def items(self) -> List[NewsItem]:
+        """Articles in the covered interval, oldest first."""
+        if self.covered_start is None:
+            return []
+        ids = [i for i in self.store.range(self.covered_start, self.covered_end) if i in self._ids]
+        return self.store.get_many(ids)
+
+    def reset(self):
+        self.covered_start = None
+        self.covered_end = None
+        self._ids = set()
+
+    def gap(self, start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+        """
+        Returns the interval that still has to be fetched for [start, end).
+        Resets the timeline when the request does not slide forward from
+        the covered interval (first step, jump in time, wider window...).
+        """
+        start, end = _naive(start), _naive(end)
+        if (
+            self.covered_start is None
+            or start < self.covered_start
+            or start > self.covered_end
+            or end < self.covered_end
+        ):
+            self.reset()
+            return start, end
+        return self.covered_end, end
+
+    def merge(self, items: List[NewsItem], start: datetime, end: datetime):
+        """Adds newly fetched items and extends the covered interval to [.., end)."""
+        for item in items:
+            self._ids.add(self.store.intern(item).metadata["version_id"])
+        start, end = _naive(start), _naive(end)
+        if self.covered_start is None:
+            self.covered_start = start
+        self.covered_end = max(self.covered_end or end, end)
+
+    def evict_before(self, start: datetime):
+        """Drops articles that slid out of the window."""
+        start = _naive(start)
+        if self.covered_start is not None and self.covered_start < start:
+            self._ids.difference_update(self.store.range(self.covered_start, start))
+            self.covered_start = start
@@ -2,11 +2,15 @@ import requests
 import json
 import time
 import os
+import io
+import numpy as np
 import matplotlib.pyplot as plt
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from ..core.types import MarketSnapshot, NewsItem
+from ..utils.chart_store import ChartStore
 from .market import DataProvider
+from .price_summary import summarize_price_window
 
 class PolymarketDataProvider(DataProvider):
     GAMMA_URL = "https://gamma-api.polymarket.com"
@@ -16,9 +20,14 @@ class PolymarketDataProvider(DataProvider):
         self._token_cache: Dict[str, str] = {} # ticker -> clobTokenId
         self._history_cache: Dict[str, List[Dict[str, Any]]] = {} # token_id -> history
         self._fetched_ranges: Dict[str, List[tuple]] = {} # token_id -> [(start, end)]
-        self.charts_dir = "charts"
+        self._array_cache: Dict[str, Tuple[np.ndarray, np.ndarray]] = {} # token_id -> (times, prices)
+        self.chart_store = ChartStore() # Content-addressed, can be overridden by Environment
         self.lookback_days = 7 # Default, can be overridden by Environment
-        os.makedirs(self.charts_dir, exist_ok=True)
+        # "image": render a PNG chart per step; "summary": attach a numeric
+        # price digest to MarketSnapshot.chart_data instead (no rendering)
+        self.chart_mode = "image"
+        # Step budget, set per step by the environment (None = unbounded)
+        self.deadline = None
 
     def discover_markets(self, query: str, limit: int = 5, only_active: bool = False, sort_latest: bool = False) -> List[Dict[str, Any]]:
         """
@@ -138,21 +147,30 @@ class PolymarketDataProvider(DataProvider):
             self._fetch_history_window(token_id, ts_val)
 
         # 3. Get cached history
-        history = self._history_cache.get(token_id, [])
-        relevant = [p for p in history if p['t'] <= ts_val]
+        times, prices = self._get_price_arrays(token_id)
+        end_idx = int(np.searchsorted(times, ts_val, side="right"))
 
-        if not relevant:
+        if end_idx == 0:
             return None
 
-        last_p = relevant[-1]
         # Valid if within 2 days
-        if abs(ts_val - last_p['t']) > 86400 * 2:
+        if abs(ts_val - times[end_idx - 1]) > 86400 * 2:
              return None
 
-        price = float(last_p['p'])
+        price = float(prices[end_idx - 1])
         
-        # 4. Generate Chart Image
-        chart_path = self._generate_chart_image(token_id, market_id, relevant, timestamp)
+        # 4. Chart Image (or numeric digest), matched to the simulation context window
+        start_idx = int(np.searchsorted(times, ts_val - 86400 * self.lookback_days, side="left"))
+        window_times, window_prices = times[start_idx:end_idx], prices[start_idx:end_idx]
+        chart_hash, chart_path, chart_data = None, None, None
+        if self.chart_mode == "summary":
+            chart_data = summarize_price_window(window_times, window_prices) or None
+        elif self.deadline and self.deadline.expired:
+            # Out of budget: the numeric digest costs microseconds, rendering does not
+            self.deadline.degrade("chart", f"{market_id}: price summary instead of chart image")
+            chart_data = summarize_price_window(window_times, window_prices) or None
+        else:
+            chart_hash, chart_path = self._generate_chart_image(market_id, window_times, window_prices)
 
         # 5. Get Volume/Metadata
         rules_meta = self._market_rules.get(token_id, {})
@@ -166,24 +184,31 @@ class PolymarketDataProvider(DataProvider):
             last_price=price,
             volume=int(volume),
             open_interest=0,
-            image_url=chart_path
+            image_url=chart_path,
+            chart_hash=chart_hash,
+            chart_data=chart_data
         )
 
-    def _generate_chart_image(self, token_id: str, market_id: str, history: List[Dict[str, Any]], current_ts: datetime) -> Optional[str]:
+    def _get_price_arrays(self, token_id: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the cached history as sorted (times, prices) arrays."""
+        if token_id not in self._array_cache:
+            history = self._history_cache.get(token_id, [])
+            self._array_cache[token_id] = (
+                np.array([float(h['t']) for h in history], dtype=np.float64),
+                np.array([float(h['p']) for h in history], dtype=np.float64),
+            )
+        return self._array_cache[token_id]
+
+    def _generate_chart_image(self, market_id: str, window_times: np.ndarray, window_prices: np.ndarray) -> Tuple[Optional[str], Optional[str]]:
         """
-        Generates a price chart for the given history.
+        Generates a price chart for the given window and stores it in the
+        content-addressed chart store. Returns (chart_hash, chart_path).
         """
-        if not history: return None
+        if len(window_times) < 2: return None, None
         
         try:
-            # Match the chart window to the simulation context window
-            window_start = current_ts.timestamp() - (86400 * self.lookback_days)
-            chart_data = [p for p in history if p['t'] >= window_start]
-            
-            if len(chart_data) < 2: return None
-            
-            times = [datetime.fromtimestamp(p['t']) for p in chart_data]
-            prices = [float(p['p']) for p in chart_data]
+            times = [datetime.fromtimestamp(t) for t in window_times]
+            prices = window_prices
             
             plt.figure(figsize=(10, 5))
             plt.plot(times, prices, marker=None, linestyle='-', color='#007aff')
@@ -196,15 +221,15 @@ class PolymarketDataProvider(DataProvider):
             # Formatting
             plt.gcf().autofmt_xdate()
             
-            filename = f"{token_id}_{int(current_ts.timestamp())}.png"
-            filepath = os.path.join(self.charts_dir, filename)
-            plt.savefig(filepath)
+            # Identical charts (e.g. reruns of the same market/window) dedupe to one file
+            buf = io.BytesIO()
+            plt.savefig(buf, format="png")
             plt.close()
             
-            return os.path.abspath(filepath)
+            return self.chart_store.put(buf.getvalue())
         except Exception as e:
             print(f"Error generating chart: {e}")
-            return None
+            return None, None
 
     def get_news(self, timestamp_start: datetime, timestamp_end: datetime) -> List[NewsItem]:
         return []
@@ -340,6 +365,7 @@ class PolymarketDataProvider(DataProvider):
                 all_history = existing + formatted
                 unique_history = {h['t']: h['p'] for h in all_history}
                 self._history_cache[token_id] = sorted([{'t': t, 'p': p} for t, p in unique_history.items()], key=lambda x: x['t'])
+                self._array_cache.pop(token_id, None)
                 
                 if token_id not in self._fetched_ranges: self._fetched_ranges[token_id] = []
                 self._fetched_ranges[token_id].append((start_ts, end_ts))
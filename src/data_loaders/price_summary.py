@@ -0,0 +1,89 @@
+import numpy as np
+from datetime import datetime, timezone
+from typing import Dict, Any
+
+
+def summarize_price_window(times: np.ndarray, prices: np.ndarray, n_points: int = 12, top_moves: int = 3) -> Dict[str, Any]:
+    """
+    Compact numeric digest of a price window, used instead of a chart image
+    for text-only providers. All statistics are computed vectorized over the
+    (sorted) epoch-second `times` and `prices` arrays.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(times) < 2:
+        return {}
+
+    # Daily OHLC (UTC days): segment boundaries where the day index changes
+    day_idx = (times // 86400).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, day_idx[1:] != day_idx[:-1]])
+    ends = np.r_[starts[1:] - 1, len(prices) - 1]
+    opens, closes = prices[starts], prices[ends]
+    highs = np.maximum.reduceat(prices, starts)
+    lows = np.minimum.reduceat(prices, starts)
+
+    # Realized volatility of price changes (in probability points)
+    diffs = np.diff(prices)
+    n_days = max(1.0, (times[-1] - times[0]) / 86400)
+    realized_vol = float(np.sqrt(np.sum(diffs ** 2)))
+    daily_vol = float(np.sqrt(np.sum(diffs ** 2) / n_days))
+
+    # Largest single-interval moves
+    k = min(top_moves, len(diffs))
+    move_idx = np.argpartition(-np.abs(diffs), k - 1)[:k] if k > 0 else np.array([], dtype=np.int64)
+    move_idx = move_idx[np.argsort(-np.abs(diffs[move_idx]))]
+
+    # Evenly resampled series
+    grid = np.linspace(times[0], times[-1], n_points)
+    resampled = np.interp(grid, times, prices)
+
+    def fmt_ts(ts: float, pattern: str) -> str:
+        return datetime.fromtimestamp(float(ts), tz=timezone.utc).strftime(pattern)
+
+    return {
+        "start": fmt_ts(times[0], "%Y-%m-%d %H:%M"),
+        "end": fmt_ts(times[-1], "%Y-%m-%d %H:%M"),
+        "first": round(float(prices[0]), 4),
+        "last": round(float(prices[-1]), 4),
+        "change": round(float(prices[-1] - prices[0]), 4),
+        "realized_vol": round(realized_vol, 4),
+        "daily_vol": round(daily_vol, 4),
+        "daily_ohlc": [
+            {
+                "date": fmt_ts(times[s], "%Y-%m-%d"),
+                "open": round(float(o), 4),
+                "high": round(float(h), 4),
+                "low": round(float(l), 4),
+                "close": round(float(c), 4),
+            }
+            for s, o, h, l, c in zip(starts, opens, highs, lows, closes)
+        ],
+        "largest_moves": [
+            {
+                "from": fmt_ts(times[i], "%Y-%m-%d %H:%M"),
+                "to": fmt_ts(times[i + 1], "%Y-%m-%d %H:%M"),
+                "change": round(float(diffs[i]), 4),
+            }
+            for i in move_idx
+        ],
+        "resampled": [round(float(p), 4) for p in resampled],
+    }
+
+
+def format_price_summary(summary: Dict[str, Any]) -> str:
+    """Renders a price digest as a few prompt lines."""
+    if not summary:
+        return "Price history: not enough data."
+
+    lines = [
+        f"Price history {summary['start']} → {summary['end']} (UTC): {summary['first']:.3f} → {summary['last']:.3f} "
+        f"({summary['change']:+.3f}) | Realized vol: {summary['realized_vol']:.3f} (daily {summary['daily_vol']:.3f})",
+        "Daily O/H/L/C: " + "; ".join(
+            f"{d['date'][5:]} {d['open']:.3f}/{d['high']:.3f}/{d['low']:.3f}/{d['close']:.3f}" for d in summary["daily_ohlc"]
+        ),
+        "Largest moves: " + "; ".join(
+            f"{m['from']} → {m['to']} {m['change']:+.3f}" for m in summary["largest_moves"]
+        ),
+        "Resampled series: " + ", ".join(f"{p:.3f}" for p in summary["resampled"]),
+    ]
+    return "\n".join(lines)
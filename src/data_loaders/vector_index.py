@@ -0,0 +1,244 @@
+"""
+Date-sharded dense-vector news index.
+
+Article embeddings are stored per publication day as memory-mapped NumPy
+shards next to the article metadata:
+
+    <index_dir>/index.json                  manifest: embedder, dim, day -> doc count
+    <index_dir>/shards/YYYY-MM-DD.npy       float32 (n, dim), L2-normalized embeddings
+    <index_dir>/shards/YYYY-MM-DD.ts.npy    int64 publication times (epoch seconds)
+    <index_dir>/shards/YYYY-MM-DD.jsonl     one article per line
+    <index_dir>/shards/YYYY-MM-DD.off.npy   byte offset of each line in the .jsonl
+
+A query only touches the shards of the days inside [start, end): each one is
+mmapped, masked to the exact bounds and scanned brute-force with a single
+matrix-vector product, and only the winning rows' metadata is read from disk.
+
+Build/extend an index:
+    python -m src.data_loaders.vector_index articles.jsonl --index-dir cache/vector_index --embedder hashing
+"""
+
+import io
+import os
+import json
+import bisect
+import argparse
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..utils.storage import atomic_write_bytes, atomic_write_json, read_json
+from ..utils.text import tokenize
+from .local_corpus import iter_records, normalize_record
+
+DEFAULT_VECTOR_INDEX = os.path.join("cache", "vector_index")
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch(ts: datetime) -> int:
+    return int((ts.replace(tzinfo=None) - _EPOCH).total_seconds())
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+# --- Embedders ---
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder: signed feature hashing of unigrams and bigrams.
+    Captures lexical overlap only, but works fully offline and is
+    deterministic across processes.
+    """
+    name = "hashing"
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _bucket(self, feature: str):
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        return h % self.dim, 1.0 if (h >> 63) & 1 else -1.0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            for feature in tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])]:
+                col, sign = self._bucket(feature)
+                out[row, col] += sign
+        return _normalize_rows(out)
+
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI API (requires OPENAI_API_KEY)."""
+    name = "openai"
+
+    def __init__(self, model: str = "text-embedding-3-small", dim: int = 1536, batch_size: int = 256, api_key: Optional[str] = None):
+        from openai import OpenAI
+        self.client = OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+        self.model = model
+        self.dim = dim
+        self.batch_size = batch_size
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        rows = []
+        for i in range(0, len(texts), self.batch_size):
+            batch = [t[:8000] or " " for t in texts[i:i + self.batch_size]]
+            response = self.client.embeddings.create(model=self.model, input=batch, dimensions=self.dim)
+            rows.extend(d.embedding for d in response.data)
+        return _normalize_rows(np.array(rows).reshape(len(texts), self.dim))
+
+
+def make_embedder(name: str = "hashing", dim: Optional[int] = None):
+    if name == "openai":
+        return OpenAIEmbedder(dim=dim or 1536)
+    if name == "hashing":
+        return HashingEmbedder(dim=dim or 512)
+    raise ValueError(f"Unknown embedder: {name}")
+
+
+# --- Index ---
+
+class VectorIndex:
+    def __init__(self, index_dir: str = DEFAULT_VECTOR_INDEX, embedder=None):
+        self.index_dir = index_dir
+        self.manifest = read_json(self._manifest_path()) or {"days": {}}
+        if embedder is None and "embedder" in self.manifest:
+            embedder = make_embedder(self.manifest["embedder"], self.manifest["dim"])
+        self.embedder = embedder or HashingEmbedder()
+        if self.manifest.get("embedder", self.embedder.name) != self.embedder.name or self.manifest.get("dim", self.embedder.dim) != self.embedder.dim:
+            raise ValueError(
+                f"Index at {index_dir} was built with {self.manifest['embedder']}/{self.manifest['dim']}, "
+                f"not {self.embedder.name}/{self.embedder.dim}"
+            )
+        self.days = sorted(self.manifest["days"])
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.index_dir, "index.json")
+
+    def _shard_path(self, day: str, suffix: str) -> str:
+        return os.path.join(self.index_dir, "shards", f"{day}{suffix}")
+
+    def add(self, docs: List[Dict[str, Any]], batch_size: int = 1024) -> Dict[str, int]:
+        """
+        Embeds and appends normalized article dicts (see local_corpus.normalize_record).
+        Articles already in their day's shard (same timestamp + headline) are skipped.
+        """
+        by_day: Dict[str, List[Dict[str, Any]]] = {}
+        for doc in docs:
+            by_day.setdefault(doc["timestamp"][:10], []).append(doc)
+
+        touched = {}
+        for day, new_docs in sorted(by_day.items()):
+            jsonl_path = self._shard_path(day, ".jsonl")
+            existing = []
+            if os.path.exists(jsonl_path):
+                with open(jsonl_path) as f:
+                    existing = [json.loads(line) for line in f]
+            seen = {(d["timestamp"], d["headline"]) for d in existing}
+            fresh = []
+            for doc in new_docs:
+                if (doc["timestamp"], doc["headline"]) not in seen:
+                    seen.add((doc["timestamp"], doc["headline"]))
+                    fresh.append(doc)
+            if not fresh:
+                continue
+
+            texts = [d["headline"] + "\n" + d["content"] for d in fresh]
+            vectors = np.concatenate([self.embedder.embed(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)])
+            timestamps = np.array([_epoch(datetime.fromisoformat(d["timestamp"])) for d in fresh], dtype=np.int64)
+            if existing:
+                vectors = np.concatenate([np.load(self._shard_path(day, ".npy")), vectors])
+                timestamps = np.concatenate([np.load(self._shard_path(day, ".ts.npy")), timestamps])
+
+            lines = [json.dumps(d, default=str).encode("utf-8") + b"\n" for d in existing + fresh]
+            offsets = np.cumsum([0] + [len(line) for line in lines[:-1]]).astype(np.int64)
+            self._save_npy(self._shard_path(day, ".npy"), vectors.astype(np.float32))
+            self._save_npy(self._shard_path(day, ".ts.npy"), timestamps)
+            self._save_npy(self._shard_path(day, ".off.npy"), offsets)
+            atomic_write_bytes(jsonl_path, b"".join(lines))
+            self.manifest["days"][day] = len(lines)
+            touched[day] = len(lines)
+
+        self.manifest.update(embedder=self.embedder.name, dim=self.embedder.dim, built_at=datetime.now().isoformat())
+        atomic_write_json(self._manifest_path(), self.manifest)
+        self.days = sorted(self.manifest["days"])
+        return touched
+
+    @staticmethod
+    def _save_npy(path: str, array: np.ndarray):
+        buf = io.BytesIO()
+        np.save(buf, array)
+        atomic_write_bytes(path, buf.getvalue())
+
+    def _read_docs(self, day: str, rows: List[int]) -> List[Dict[str, Any]]:
+        offsets = np.load(self._shard_path(day, ".off.npy"), mmap_mode="r")
+        docs = []
+        with open(self._shard_path(day, ".jsonl"), "rb") as f:
+            for row in rows:
+                f.seek(int(offsets[row]))
+                docs.append(json.loads(f.readline()))
+        return docs
+
+    def search(self, query: str, start: Optional[datetime] = None, end: Optional[datetime] = None, k: int = 7) -> List[Dict[str, Any]]:
+        """Top-k articles published in [start, end) by cosine similarity (open bounds if None)."""
+        lo = 0 if start is None else bisect.bisect_left(self.days, start.date().isoformat())
+        hi = len(self.days) if end is None else bisect.bisect_right(self.days, (end - timedelta(microseconds=1)).date().isoformat())
+        if lo >= hi:
+            return []
+        t0 = None if start is None else _epoch(start)
+        t1 = None if end is None else _epoch(end)
+        q = self.embedder.embed([query])[0]
+
+        best_scores, best_refs = np.empty(0, dtype=np.float32), []
+        for day in self.days[lo:hi]:
+            vectors = np.load(self._shard_path(day, ".npy"), mmap_mode="r")
+            scores = vectors @ q
+            timestamps = np.load(self._shard_path(day, ".ts.npy"), mmap_mode="r")
+            mask = np.ones(len(scores), dtype=bool)
+            if t0 is not None:
+                mask &= timestamps >= t0
+            if t1 is not None:
+                mask &= timestamps < t1
+            rows = np.flatnonzero(mask)
+            if len(rows) > k:
+                rows = rows[np.argpartition(-scores[rows], k - 1)[:k]]
+            best_scores = np.concatenate([best_scores, scores[rows]])
+            best_refs.extend((day, int(r)) for r in rows)
+            if len(best_refs) > k:
+                keep = np.argpartition(-best_scores, k - 1)[:k]
+                best_scores, best_refs = best_scores[keep], [best_refs[i] for i in keep]
+
+        order = np.argsort(-best_scores)
+        by_day: Dict[str, List[int]] = {}
+        for i in order:
+            by_day.setdefault(best_refs[i][0], []).append(best_refs[i][1])
+        docs = {}
+        for day, rows in by_day.items():
+            for row, doc in zip(rows, self._read_docs(day, rows)):
+                docs[(day, row)] = doc
+        return [dict(docs[best_refs[i]], score=round(float(best_scores[i]), 4)) for i in order]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or extend the dense-vector news index.")
+    parser.add_argument("inputs", nargs="+", help="JSONL/JSON/Parquet files or directories of articles")
+    parser.add_argument("--index-dir", type=str, default=DEFAULT_VECTOR_INDEX, help="Index location")
+    parser.add_argument("--embedder", type=str, default="hashing", choices=["hashing", "openai"], help="Embedding backend")
+    parser.add_argument("--dim", type=int, default=None, help="Embedding dimension (default: 512 hashing / 1536 openai)")
+    args = parser.parse_args()
+
+    index = VectorIndex(args.index_dir, embedder=make_embedder(args.embedder, args.dim))
+    docs = [doc for path in args.inputs for doc in map(normalize_record, iter_records(path)) if doc]
+    touched = index.add(docs)
+    print(f"Indexed {len(docs)} article(s) into {len(touched)} day shard(s) at {args.index_dir}")
+
+
+if __name__ == "__main__":
+    main()
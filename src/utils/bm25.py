@@ -0,0 +1,62 @@
+import math
+from collections import Counter
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# Okapi BM25 defaults
+K1 = 1.2
+B = 0.75
+
+
+def idf(df: int, n_docs: int) -> float:
+    """BM25 inverse document frequency (the +1 keeps it positive for common terms)."""
+    return math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+def score_documents(
+    query_tokens: Sequence[str],
+    term_freqs: List[Dict[str, int]],
+    doc_lens: Sequence[int],
+    df: Dict[str, int],
+    n_docs: int,
+    avgdl: float,
+    k1: float = K1,
+    b: float = B,
+) -> List[float]:
+    """
+    BM25 score of each document for `query_tokens`. Collection statistics
+    (df, n_docs, avgdl) are passed in so callers can restrict them to a
+    subset of the corpus, e.g. a time window.
+    """
+    query = Counter(query_tokens)
+    weights = {t: idf(df.get(t, 0), n_docs) for t in query}
+    avgdl = avgdl or 1.0
+    scores = []
+    for tf, dl in zip(term_freqs, doc_lens):
+        norm = k1 * (1.0 - b + b * dl / avgdl)
+        s = 0.0
+        for t, qtf in query.items():
+            f = tf.get(t)
+            if f:
+                s += qtf * weights[t] * f * (k1 + 1.0) / (f + norm)
+        scores.append(s)
+    return scores
+
+
+def score_matrix(
+    tf: np.ndarray,
+    doc_lens: np.ndarray,
+    idf_weights: np.ndarray,
+    query_weights: np.ndarray,
+    k1: float = K1,
+    b: float = B,
+) -> np.ndarray:
+    """
+    Vectorized BM25: `tf` is an (n_docs, n_terms) term-frequency matrix over
+    the query vocabulary; returns one score per document.
+    """
+    avgdl = doc_lens.mean() if len(doc_lens) and doc_lens.mean() > 0 else 1.0
+    norm = k1 * (1.0 - b + b * doc_lens / avgdl)
+    saturated = tf * (k1 + 1.0) / (tf + norm[:, None])
+    return saturated @ (idf_weights * query_weights)
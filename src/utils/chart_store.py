@@ -0,0 +1,168 @@
+"""
+Content-addressed chart storage.
+
+Charts are stored once per unique image under `<root>/<aa>/<sha256>.png`
+and referenced from step logs by their hash. Re-rendering an identical chart
+(same market, same window, e.g. on a rerun) only refreshes the file's mtime,
+which the retention policy uses as "last used".
+
+Garbage collection:
+    python -m src.utils.chart_store --max-age-days 30 --max-size-mb 500
+    python -m src.utils.chart_store --max-age-days 14 --legacy-dir charts --dry-run
+"""
+
+import os
+import time
+import argparse
+from typing import List, Optional, Tuple, Dict, Any
+
+from .storage import atomic_write_bytes, sha256_hex
+
+DEFAULT_CHART_STORE = os.path.join("charts", "store")
+
+
+class ChartStore:
+    def __init__(self, root: str = DEFAULT_CHART_STORE):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, digest: str, suffix: str = ".png") -> str:
+        # Two-character fan-out keeps any single directory small
+        return os.path.join(self.root, digest[:2], f"{digest}{suffix}")
+
+    def put(self, data: bytes, suffix: str = ".png") -> Tuple[str, str]:
+        """
+        Stores `data` if not already present. Returns (digest, absolute path).
+        """
+        digest = sha256_hex(data)
+        path = self.path_for(digest, suffix)
+        if os.path.exists(path):
+            os.utime(path, None)  # Mark as recently used for retention
+        else:
+            atomic_write_bytes(path, data)
+        return digest, os.path.abspath(path)
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.startswith(".tmp-"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def gc(self, max_age_days: Optional[float] = None, max_bytes: Optional[int] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Deletes charts unused for more than `max_age_days`, then the least
+        recently used ones until the store is under `max_bytes`.
+        """
+        entries = sorted(self._entries())  # Oldest first
+        now = time.time()
+        removed, freed = [], 0
+
+        keep = []
+        for mtime, size, path in entries:
+            if max_age_days is not None and now - mtime > max_age_days * 86400:
+                removed.append(path)
+                freed += size
+            else:
+                keep.append((mtime, size, path))
+
+        if max_bytes is not None:
+            total = sum(size for _, size, _ in keep)
+            for mtime, size, path in keep:
+                if total <= max_bytes:
+                    break
+                removed.append(path)
+                freed += size
+                total -= size
+
+        if not dry_run:
+            for path in removed:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            _remove_empty_dirs(self.root)
+
+        return {"files_removed": len(removed), "bytes_freed": freed, "files_scanned": len(entries)}
+
+
+def gc_legacy_charts(directories: List[str], max_age_days: float, dry_run: bool = False, store_root: str = DEFAULT_CHART_STORE) -> Dict[str, Any]:
+    """
+    Age-based cleanup for pre-store flat chart folders (`charts/*.png`,
+    `runs/<ticker>/<run_id>/charts/*.png`).
+    """
+    now = time.time()
+    store_root = os.path.abspath(store_root)
+    removed, freed = 0, 0
+    for directory in directories:
+        for dirpath, _, filenames in os.walk(directory):
+            if _is_within(os.path.abspath(dirpath), store_root):
+                continue
+            for name in filenames:
+                if not name.endswith(".png"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    # Another run may delete or replace charts while we walk
+                    st = os.stat(path)
+                    if now - st.st_mtime <= max_age_days * 86400:
+                        continue
+                    if not dry_run:
+                        os.remove(path)
+                except OSError:
+                    continue
+                removed += 1
+                freed += st.st_size
+    return {"files_removed": removed, "bytes_freed": freed}
+
+
+def _is_within(path: str, root: str) -> bool:
+    # Path-component prefix: "charts_old" is not inside "charts"
+    try:
+        return os.path.commonpath([path, root]) == root
+    except ValueError:  # Different drives (Windows)
+        return False
+
+
+def _remove_empty_dirs(root: str):
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        if dirpath != root and not dirnames and not filenames:
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chart store retention / garbage collection")
+    parser.add_argument("--root", type=str, default=DEFAULT_CHART_STORE, help="Chart store directory")
+    parser.add_argument("--max-age-days", type=float, default=None, help="Delete charts unused for longer than this")
+    parser.add_argument("--max-size-mb", type=float, default=None, help="Evict least recently used charts above this size")
+    parser.add_argument("--legacy-dir", action="append", default=[], help="Also age out flat *.png charts under this directory (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted without deleting")
+    args = parser.parse_args()
+
+    if args.max_age_days is None and args.max_size_mb is None:
+        parser.error("Specify --max-age-days and/or --max-size-mb")
+
+    max_bytes = int(args.max_size_mb * 1024 * 1024) if args.max_size_mb is not None else None
+    stats = ChartStore(args.root).gc(max_age_days=args.max_age_days, max_bytes=max_bytes, dry_run=args.dry_run)
+    prefix = "[Dry Run] " if args.dry_run else ""
+    print(f"{prefix}Chart store: removed {stats['files_removed']}/{stats['files_scanned']} files, freed {stats['bytes_freed'] / 1e6:.1f} MB")
+
+    if args.legacy_dir:
+        if args.max_age_days is None:
+            parser.error("--legacy-dir requires --max-age-days")
+        legacy = gc_legacy_charts(args.legacy_dir, args.max_age_days, dry_run=args.dry_run, store_root=args.root)
+        print(f"{prefix}Legacy charts: removed {legacy['files_removed']} files, freed {legacy['bytes_freed'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
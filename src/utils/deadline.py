@@ -0,0 +1,49 @@
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class Deadline:
+    """
+    Wall-clock budget for one simulation step, shared by every stage that
+    may block (news sources, price history/charts, image fetching).
+
+    Stages ask for `remaining(cap)` to bound their own waits and call
+    `degrade()` whenever they return a cached or partial result because the
+    budget ran out; the environment writes those records to the step log.
+    A Deadline built with `seconds=None` never expires.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.expires = None if seconds is None else self.started + seconds
+        self.degradations: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def remaining(self, cap: Optional[float] = None) -> Optional[float]:
+        """Seconds left (never negative), capped at `cap`; None if unbounded and no cap."""
+        if self.expires is None:
+            return cap
+        left = max(0.0, self.expires - time.monotonic())
+        return left if cap is None else min(cap, left)
+
+    @property
+    def expired(self) -> bool:
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def binds(self, cap: float) -> bool:
+        """True when the step budget, not the stage's own `cap`, is the tighter limit."""
+        return self.expires is not None and self.expires - time.monotonic() < cap
+
+    def degrade(self, stage: str, detail: str):
+        with self._lock:
+            self.degradations.append({
+                "stage": stage,
+                "detail": detail,
+                "at_s": round(time.monotonic() - self.started, 3),
+            })
+        print(f"[Step Budget] {stage}: {detail}")
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
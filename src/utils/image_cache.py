@@ -0,0 +1,53 @@
+import os
+import time
+from typing import Optional, Tuple
+
+from .storage import atomic_write_json, read_json, sha256_hex
+
+DEFAULT_IMAGE_CACHE = os.path.join("cache", "images")
+
+
+class ImageCache:
+    """
+    Disk-backed cache of converted, validated image payloads keyed by URL.
+
+    Successful entries hold the final base64 data URL (so a hit needs no
+    download, conversion or validation). Failures (too small, unsupported
+    type, timeout, HTTP errors) are remembered for `negative_ttl` seconds so
+    dead URLs are not retried on every step of the sliding window.
+    """
+
+    def __init__(self, root: str = DEFAULT_IMAGE_CACHE, negative_ttl: float = 86400.0):
+        self.root = root
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, url: str, variant: str = "") -> str:
+        key = sha256_hex(f"{variant}|{url}".encode("utf-8"))
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, url: str, variant: str = "") -> Tuple[bool, Optional[str]]:
+        """
+        Returns (found, payload). A found entry with payload None is a
+        remembered failure that has not expired yet.
+        """
+        entry = read_json(self._path(url, variant))
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        if entry.get("payload") is None:
+            if time.time() - entry.get("ts", 0) > self.negative_ttl:
+                self.misses += 1
+                return False, None
+
+        self.hits += 1
+        return True, entry.get("payload")
+
+    def put(self, url: str, payload: str, variant: str = ""):
+        atomic_write_json(self._path(url, variant), {"url": url, "payload": payload, "ts": time.time()})
+
+    def put_failure(self, url: str, reason: str, variant: str = ""):
+        atomic_write_json(self._path(url, variant), {"url": url, "payload": None, "error": reason, "ts": time.time()})
@@ -0,0 +1,67 @@
+import io
+from typing import Tuple, Optional
+from PIL import Image
+
+# Effective resolution the Vision API works at for each detail level.
+# "low": the whole image is seen as a single 512x512 tile.
+# "high": fit within 2048x2048, then scale so the shortest side is <= 768.
+LOW_DETAIL_MAX_SIDE = 512
+HIGH_DETAIL_MAX_SIDE = 2048
+HIGH_DETAIL_SHORT_SIDE = 768
+
+# Default payload budget per image (bytes, before base64)
+DEFAULT_MAX_BYTES = {"low": 64 * 1024, "high": 256 * 1024}
+
+QUALITY_STEPS = [85, 75, 65, 55, 45, 35]
+
+MIME_BY_FORMAT = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+
+def effective_size(width: int, height: int, detail: str = "low") -> Tuple[int, int]:
+    """Returns the largest size the model actually sees at the given detail level."""
+    if detail == "high":
+        scale = min(1.0, HIGH_DETAIL_MAX_SIDE / max(width, height))
+        short_side = min(width, height) * scale
+        if short_side > HIGH_DETAIL_SHORT_SIDE:
+            scale *= HIGH_DETAIL_SHORT_SIDE / short_side
+    else:
+        scale = min(1.0, LOW_DETAIL_MAX_SIDE / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def prepare_image(data: bytes, detail: str = "low", fmt: str = "JPEG", max_bytes: Optional[int] = None) -> Tuple[bytes, str]:
+    """
+    Downscales an image to the effective resolution of `detail` and recompresses
+    it as JPEG/WebP, stepping quality down until it fits `max_bytes`.
+    Returns (image_bytes, mime_type). Raises if the data is not a readable image.
+    """
+    fmt = fmt.upper()
+    if fmt not in MIME_BY_FORMAT:
+        raise ValueError(f"Unsupported output format: {fmt}")
+    max_bytes = max_bytes or DEFAULT_MAX_BYTES.get(detail, DEFAULT_MAX_BYTES["low"])
+
+    img = Image.open(io.BytesIO(data))
+    img.seek(0)  # First frame of animated GIF/WebP
+
+    target = effective_size(img.width, img.height, detail)
+    if target != (img.width, img.height):
+        img = img.resize(target, Image.LANCZOS)
+
+    if fmt == "JPEG" or img.mode not in ("RGB", "RGBA"):
+        if img.mode in ("RGBA", "LA", "P"):
+            # Flatten transparency onto white (charts and logos stay legible)
+            rgba = img.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.split()[-1])
+            img = background
+        else:
+            img = img.convert("RGB")
+
+    output = b""
+    for quality in QUALITY_STEPS:
+        buf = io.BytesIO()
+        img.save(buf, format=fmt, quality=quality, optimize=True)
+        output = buf.getvalue()
+        if len(output) <= max_bytes:
+            break
+    return output, MIME_BY_FORMAT[fmt]
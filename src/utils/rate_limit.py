@@ -0,0 +1,78 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Per-minute allowance, refilled continuously (capacity / 60 per second)."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (requests larger than the bucket wait for a full one)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def adjust(self, delta: float):
+        """Takes (negative) or returns (positive) units; the level may go below zero."""
+        self._refill()
+        self.level = min(self.capacity, self.level + delta)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets for one API account,
+    plus an account-wide pause after a 429 (honoring its retry-after).
+
+    Callers `acquire` with their token estimate before each request and
+    `reconcile` with the actual usage afterwards. Waiters are served in
+    arrival order; one with a `timeout` gives up (taking nothing) as soon
+    as the wait is known to exceed it. Must be used from a single event loop.
+    """
+
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int, timeout: Optional[float] = None) -> bool:
+        """Waits until `tokens` and one request are available and takes them; False if `timeout` ran out first."""
+        give_up = None if timeout is None else time.monotonic() + timeout
+        try:
+            await asyncio.wait_for(self._lock.acquire(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        try:
+            while True:
+                wait = max(
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(tokens),
+                    self.paused_until - time.monotonic(),
+                )
+                if wait <= 0:
+                    break
+                if give_up is not None and time.monotonic() + wait > give_up:
+                    return False
+                await asyncio.sleep(wait)
+            self.requests.adjust(-1)
+            self.tokens.adjust(-tokens)
+            return True
+        finally:
+            self._lock.release()
+
+    def reconcile(self, estimated: int, actual: int):
+        self.tokens.adjust(estimated - actual)
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
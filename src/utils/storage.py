@@ -0,0 +1,69 @@
+import os
+import json
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process atomicity only
+    fcntl = None
+
+# Process umask, read once (reading it means setting it, which is not thread-safe)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def atomic_write_bytes(path: str, data: bytes):
+    """
+    Writes `data` to `path` via a temp file + rename so concurrent readers
+    (other simulation processes) never observe a half-written file.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp creates 0600 files; give the result the usual permissions
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_json(path: str, obj: Any):
+    atomic_write_bytes(path, json.dumps(obj, default=str).encode("utf-8"))
+
+
+def read_json(path: str) -> Optional[Any]:
+    """Returns the parsed JSON at `path`, or None if missing/corrupt."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Exclusive advisory lock on `path` (created if needed), shared across
+    processes. Used to collapse duplicate work between parallel runs.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
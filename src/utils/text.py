@@ -0,0 +1,27 @@
+import re
+from typing import List
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Small English stopword list; enough to keep ranking/dedup focused on content words
+STOPWORDS = frozenset("""
+a an and are as at be been but by for from has have he her his i in into is it its
+of on or our she that the their them they this to was we were will with you your
+not no than then there these those which who whom what when where why how all any
+can could would should may might must also about after before over under more most
+""".split())
+
+
+def tokenize(text: str, remove_stopwords: bool = True) -> List[str]:
+    """Lower-cased alphanumeric tokens, optionally without stopwords."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if remove_stopwords:
+        tokens = [t for t in tokens if t not in STOPWORDS]
+    return tokens
+
+
+def shingles(tokens: List[str], n: int = 3) -> List[str]:
+    """Overlapping word n-grams (falls back to the tokens for short texts)."""
+    if len(tokens) < n:
+        return list(tokens)
+    return [" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+from src.agents.llm_agent import SequentialLLMAgent
+from src.agents.mock_provider import MockLLMProvider
+from src.agents.token_budget import count_tokens, image_tokens
+from src.core.types import MarketSnapshot, NewsItem, Observation, PortfolioState
+
+START = datetime(2024, 3, 1)
+
+
+class RecordingProvider(MockLLMProvider):
+    """Mock provider that keeps the prompts and images of every call."""
+    model_name = "gpt-4o"
+    image_detail = "low"
+
+    def __init__(self):
+        self.calls = []
+
+    def generate(self, system_prompt, user_prompt, image_urls=None):
+        self.calls.append((system_prompt, user_prompt, list(image_urls or [])))
+        return super().generate(system_prompt, user_prompt, image_urls)
+
+
+def _observation(day: int, per_day: int = 3, window_days: int = 7) -> Observation:
+    now = START + timedelta(days=day)
+    news = [
+        NewsItem(
+            timestamp=now - timedelta(days=age, hours=i),
+            source="exa",
+            headline=f"Fed rate cut update {day - age}-{i}",
+            content="Fed officials discussed a rate cut at the next meeting. " * 20,
+            image_url=f"https://example.com/{day - age}-{i}.jpg"
+        )
+        for age in range(window_days + 1)
+        for i in range(per_day)
+    ]
+    snapshot = MarketSnapshot(
+        market_id="FED-RATE-CUT", timestamp=now, best_bid=0.4, best_ask=0.45,
+        last_price=0.42, volume=100, open_interest=50
+    )
+    portfolio = PortfolioState(cash=1000.0, positions={}, unrealized_pnl=0.0, realized_pnl=0.0, total_value=1000.0)
+    return Observation(
+        timestamp=now, context_window_days=window_days,
+        market_snapshots={"FED-RATE-CUT": snapshot}, news=news, portfolio=portfolio
+    )
+
+
+def _prompt_tokens(call) -> int:
+    system_prompt, user_prompt, image_urls = call
+    return count_tokens(system_prompt) + count_tokens(user_prompt) + len(image_urls) * image_tokens("low")
+
+
+def test_token_budget_with_prefix_stable_layout():
+    budget = 4000
+    provider = RecordingProvider()
+    agent = SequentialLLMAgent(
+        provider, market_question="Will the Fed cut rates?", relevance_ranking=False,
+        prompt_layout="prefix_stable", prefix_block_days=7, token_budget=budget
+    )
+
+    # Quiet days fit whole and get frozen; past the first week the anchor lags
+    # the window, so those days are replayed while busier days fill the budget
+    dropped_kinds = set()
+    for day in range(12):
+        agent.act(_observation(day, per_day=1 if day < 9 else 3))
+        info = agent.last_step_info
+        assert info["token_budget"]["used"] <= budget
+        assert _prompt_tokens(provider.calls[-1]) <= budget
+        dropped_kinds.update(item["kind"] for item in info["token_budget"]["dropped"])
+    assert "replay" in dropped_kinds
+
+    # The budget had to drop articles; none of them reappear through a replayed day
+    dropped = {item["key"] for item in info["token_budget"]["dropped"] if item["kind"] == "news"}
+    assert dropped
+    assert not any(headline in provider.calls[-1][1] for headline in dropped)
+
+
+def test_prefix_stable_without_budget_replays_out_of_window_days():
+    provider = RecordingProvider()
+    agent = SequentialLLMAgent(
+        provider, market_question="Will the Fed cut rates?", relevance_ranking=False,
+        prompt_layout="prefix_stable", prefix_block_days=7
+    )
+    for day in range(10):
+        agent.act(_observation(day))
+    assert agent.last_step_info["out_of_window_days"] > 0
+    assert "already seen" in provider.calls[-1][1]
+
+
+def test_prefix_stable_keeps_the_exact_window_by_default():
+    provider = RecordingProvider()
+    agent = SequentialLLMAgent(
+        provider, market_question="Will the Fed cut rates?", relevance_ranking=False,
+        prompt_layout="prefix_stable"
+    )
+    for day in range(10):
+        agent.act(_observation(day))
+        assert agent.last_step_info["out_of_window_days"] == 0
+    assert "already seen" not in provider.calls[-1][1]
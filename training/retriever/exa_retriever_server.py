@@ -19,14 +19,30 @@ If end_date is provided, Exa only returns articles published before it.
 
 Run:
     EXA_API_KEY=xxx python training/retriever/exa_retriever_server.py
+
+Offline, against a local index built with src/data_loaders/vector_index.py:
+    RETRIEVER_BACKEND=dense VECTOR_INDEX_DIR=cache/vector_index python training/retriever/exa_retriever_server.py
 """
 
 import os
+import sys
 import uvicorn
 from typing import List, Optional
 from fastapi import FastAPI
 from pydantic import BaseModel
 
+# Repo root on the path for the local dense index backend
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# "exa" (live web search) or "dense" (local date-sharded vector index)
+BACKEND = os.environ.get("RETRIEVER_BACKEND", "exa")
+VECTOR_INDEX_DIR = os.environ.get("VECTOR_INDEX_DIR", os.path.join(REPO_ROOT, "cache", "vector_index"))
+
+# Characters of article text per document (Exa truncates server-side)
+MAX_CONTENT = 2000
+
 
 class RetrieveRequest(BaseModel):
     queries: List[str]
@@ -56,8 +72,7 @@ def exa_search(
 
         kwargs = dict(
             num_results=topk,
-            text=True,
-            highlights=True,
+            text={"max_characters": MAX_CONTENT},
         )
         if end_date:
             kwargs["end_published_date"] = f"{end_date}T00:00:00Z"
@@ -78,7 +93,7 @@ def exa_search(
             if published_date:
                 pub_date_str = str(published_date)[:10]
 
-            contents = f'"{title}"\n{text[:2000]}'
+            contents = f'"{title}"\n{text[:MAX_CONTENT]}'
             docs.append(DocumentResult(
                 document={
                     "contents":       contents,
@@ -94,11 +109,46 @@ def exa_search(
         return []
 
 
+_vector_index = None
+
+
+def dense_search(query: str, topk: int, end_date: Optional[str] = None) -> List[DocumentResult]:
+    """Same contract as exa_search, served from the local dense index."""
+    global _vector_index
+    try:
+        from datetime import datetime
+        from src.data_loaders.vector_index import VectorIndex
+        if _vector_index is None:
+            _vector_index = VectorIndex(VECTOR_INDEX_DIR)
+
+        end = datetime.fromisoformat(end_date) if end_date else None
+        docs = []
+        for r in _vector_index.search(query, end=end, k=topk):
+            docs.append(DocumentResult(
+                document={
+                    "contents":       f'"{r["headline"]}"\n{r["content"][:MAX_CONTENT]}',
+                    "published_date": r["timestamp"][:10],
+                },
+                score=r["score"],
+            ))
+        return docs
+
+    except Exception as e:
+        print(f"[ExaServer] Dense search error for '{query[:60]}': {e}")
+        return []
+
+
 app = FastAPI(title="Exa Retriever Server (Training)")
 
 
 @app.post("/retrieve", response_model=RetrieveResponse)
 async def retrieve(request: RetrieveRequest):
+    if BACKEND == "dense":
+        return RetrieveResponse(result=[
+            dense_search(query, topk=request.topk, end_date=request.end_date)
+            for query in request.queries
+        ])
+
     api_key = os.environ.get("EXA_API_KEY", "")
     if not api_key:
         print("[ExaServer] WARNING: EXA_API_KEY not set — returning empty results")
@@ -119,7 +169,7 @@ async def retrieve(request: RetrieveRequest):
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "backend": "exa"}
+    return {"status": "ok", "backend": BACKEND}
 
 
 if __name__ == "__main__":